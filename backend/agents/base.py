@@ -51,6 +51,22 @@ class AgentState:
         print("Done refresh_transactions")
         print(self)
 
+    def progress(self) -> dict:
+        # Categorized but not yet flushed transactions count as processed
+        return {
+            "total": len(self.all_txns),
+            "processed": len(self.all_txns) - len(self.uncategorized_txns) + len(self.txns_to_update),
+        }
+
+    async def send_progress(self):
+        await self.websocket.send_json({
+            "type": "PROGRESS",
+            "data": {
+                "current_step": self.next_step.value,
+                "progress": self.progress(),
+            }
+        })
+
     async def flush_to_store(self):
         update_expense_categories(self.txns_to_update, self.beancount_filepath)
         self.refresh_transactions()
@@ -61,10 +77,7 @@ class AgentState:
                 "current_step": self.next_step.value,
                 "transactions":  build_transaction_dicts(self.all_txns),
                 "categories": CATEGORIES,
-                "progress": {
-                    "total": len(self.all_txns),
-                    "processed": len(self.all_txns) - len(self.uncategorized_txns),
-                },
+                "progress": self.progress(),
             }
         })
         await asyncio.sleep(2)
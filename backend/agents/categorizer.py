@@ -7,19 +7,33 @@ from typing import List
 from accounting.catagory import CATEGORIES, BATCH_SIZE
 from agents.base import AgentState, TransactionForFeedback, get_llm
 
+# Batches categorized between writes to the beancount file
+FLUSH_EVERY_BATCHES = 5
+
 class CategorizationAgent:
     def __init__(self):
         self.llm = get_llm()
         self.batch_size = BATCH_SIZE
 
     async def process_batch(self, state: AgentState) -> AgentState:
-        while state.uncategorized_txns:
-            batch = state.uncategorized_txns[:self.batch_size]
-            await self.categorize_this_batch(batch, state)
-            if state.txns_to_get_feedback:
-                print("CategorizationAgent.process_batch: To get user feedback ")
-                return state
-        print("CategorizationAgent.process_batch: Done")
+        pending = state.uncategorized_txns
+        starts = range(0, len(pending), self.batch_size)
+        try:
+            for count, start in enumerate(starts, 1):
+                batch = pending[start:start + self.batch_size]
+                await self.categorize_this_batch(batch, state)
+                await state.send_progress()
+                if state.txns_to_get_feedback:
+                    print("CategorizationAgent.process_batch: To get user feedback ")
+                    break
+                # Persist every few batches; the last one is flushed below
+                if count % FLUSH_EVERY_BATCHES == 0 and count < len(starts):
+                    await state.flush_to_store()
+            else:
+                print("CategorizationAgent.process_batch: Done")
+        finally:
+            # Keep what was categorized even if a later batch failed
+            await state.flush_to_store()
         return state
 
     async def categorize_this_batch(self, batch, state):
@@ -28,7 +42,7 @@ class CategorizationAgent:
             HumanMessage(content=self._format_transactions_for_prompt(batch))
         ]
         print(f"invoking LLM: {messages}")
-        response = str(self.llm.invoke(messages).content)
+        response = str((await self.llm.ainvoke(messages)).content)
         print(f"LLM response: {response}")
         try:
             txn_categories = json.loads(response)
@@ -40,7 +54,6 @@ class CategorizationAgent:
                     txn_categories[txn_id] = {"assessed_category": "Expenses:Uncategorized",
                                               "assessed_vendor": category_summary["assessed_vendor"]}
             self._create_categorization_summary(batch, txn_categories, state)
-            await state.flush_to_store()
         except json.JSONDecodeError:
             print("JSONDecodeError")
             raise "Error while categorizing."
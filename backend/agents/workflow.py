@@ -1,37 +1,50 @@
+import logging
 from enum import Enum
+from functools import lru_cache
 from typing import Annotated, Literal
-from langgraph.graph import StateGraph
+from langgraph.graph import END, StateGraph
 from langgraph.graph.state import CompiledStateGraph
 from agents.base import AgentState, Step
 from agents.categorizer import CategorizationAgent
 from agents.orchestrator import OrchestratorAgent
 # from agents.summarizer import SummaryAgent
 
+logger = logging.getLogger(__name__)
+
 
 def log_transition(state: AgentState) -> AgentState:
     """Hook that logs state transitions"""
-    print(f"State transition occurred. Current state: {state}")
+    logger.debug("State transition occurred. Current state: %s", state)
     return state
 
-async def router(state: AgentState) -> str | None:
-    """Router function that returns the next node based on state"""
-    print("router state next_step: ", state.next_step)
+def router(state: AgentState) -> str:
+    """Router function that returns the next step based on state"""
+    logger.debug("router state next_step: %s", state.next_step)
     return state.next_step.value
 
 
+# Static map from router output to graph node
+ROUTES = {
+    Step.CATEGORIZE.value: Step.CATEGORIZE.value,
+    Step.GET_USER_FEEDBACK.value: Step.GET_USER_FEEDBACK.value,
+    Step.END.value: END,
+}
+
+
+@lru_cache(maxsize=1)
 def create_workflow() -> CompiledStateGraph:
+    """Build and compile the workflow graph once; per-run state lives in AgentState."""
     workflow = StateGraph(AgentState)
+    orchestrator = OrchestratorAgent()
 
-    workflow.add_node(Step.ORCHESTRATE.value, OrchestratorAgent().orchestrate)
+    workflow.add_node(Step.ORCHESTRATE.value, orchestrator.orchestrate)
     workflow.add_node(Step.CATEGORIZE.value, CategorizationAgent().process_batch)
-    workflow.add_node(Step.GET_USER_FEEDBACK.value, OrchestratorAgent().get_user_feedback)
+    workflow.add_node(Step.GET_USER_FEEDBACK.value, orchestrator.get_user_feedback)
     # workflow.add_node(Step.SUMMARIZE.value, SummaryAgent().create_summary)
-    workflow.add_node(Step.END.value, lambda x: x)
 
-    workflow.add_conditional_edges(Step.ORCHESTRATE.value, router, None, None)
+    workflow.add_conditional_edges(Step.ORCHESTRATE.value, router, ROUTES)
     workflow.add_edge(Step.CATEGORIZE.value, Step.ORCHESTRATE.value)
     workflow.add_edge(Step.GET_USER_FEEDBACK.value, Step.ORCHESTRATE.value)
 
     workflow.set_entry_point(Step.ORCHESTRATE.value)
-    workflow.set_finish_point(Step.END.value)
     return workflow.compile()
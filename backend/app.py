@@ -1,42 +1,63 @@
-from fastapi import FastAPI, Request, Response
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Callable, Awaitable
-from contextlib import asynccontextmanager
+from fastapi.responses import ORJSONResponse
+from contextlib import asynccontextmanager, suppress
+from datetime import date
+import asyncio
+import logging
 
 from uiflow import router as flow_router
 from transactions_api import router as transactions_router
 from convert_currency_api import router as convert_router
 from networth_api import router as networth_router
-from database.session import init_db
+from database.repository import BalanceRepository
+from database.session import init_db, reset_engine_async, session_context_rw
+
+logger = logging.getLogger(__name__)
+
+# How often each worker makes sure the current month's balance checkpoints
+# exist; writes are idempotent, so workers need no coordination
+BALANCE_CHECKPOINT_INTERVAL = 24 * 60 * 60
+
+
+async def refresh_balance_checkpoints():
+    """Write balance checkpoints dated the first of the current month, daily."""
+    while True:
+        try:
+            async with session_context_rw() as session:
+                await BalanceRepository(session).cache_balances(date.today().replace(day=1))
+        except Exception:
+            logger.exception("Refreshing balance checkpoints failed")
+        await asyncio.sleep(BALANCE_CHECKPOINT_INTERVAL)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db()
+    checkpoints = asyncio.create_task(refresh_balance_checkpoints())
     yield
+    checkpoints.cancel()
+    with suppress(asyncio.CancelledError):
+        await checkpoints
+    await reset_engine_async()
 
 
-app = FastAPI(lifespan=lifespan)
-
-# Middleware to strip `/api` from the path
-@app.middleware("http")
-async def rewrite_api_path(request: Request, call_next: Callable[[Request], Awaitable[Response]]):
-    if request.url.path.startswith("/api"):
-        scope = request.scope
-        scope["path"] = request.url.path[len("/api") :]
-        request = Request(scope, request.receive)
-    response = await call_next(request)
-    return response
+# Responses are encoded to JSON-compatible data (Decimals as strings via
+# the response models) before rendering, so orjson needs no extra options.
+# Endpoints that already hold validated models (the networth lists and
+# summary) return pydantic-core JSON bytes directly and skip this path
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
-app.include_router(flow_router)
-app.include_router(transactions_router)
-app.include_router(convert_router)
-app.include_router(networth_router)
+# Serve every route both at its own path and under `/api`, so the router
+# handles the prefix instead of a per-request path-rewriting middleware
+for router in (flow_router, transactions_router, convert_router, networth_router):
+    app.include_router(router)
+    app.include_router(router, prefix="/api", include_in_schema=False)
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000"],
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PATCH", "DELETE", "OPTIONS"],
+    allow_headers=["Content-Type", "Authorization", "X-Requested-With"],
 )
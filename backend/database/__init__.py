@@ -7,22 +7,64 @@ This package provides:
 - Repository pattern for CRUD operations
 """
 
-from database.config import get_settings, Settings
-from database.models import (
-    Account,
-    AccountType,
-    Transaction,
-    Posting,
-    Balance,
-    TransactionLink,
-    TransactionTag,
-)
-from database.repository import AccountRepository, TransactionRepository
-from database.session import get_session, init_db, AsyncSessionLocal
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from database.config import get_settings, settings, Settings
+    from database.models import (
+        Account,
+        AccountType,
+        Transaction,
+        Posting,
+        Balance,
+        TransactionLink,
+        TransactionTag,
+    )
+    from database.repository import AccountRepository, TransactionRepository
+    from database.session import get_session, init_db, AsyncSessionLocal
+
+# Submodules are imported on first attribute access (PEP 562), so importing
+# one helper doesn't pull in the whole model and repository graph
+_lazy = {
+    # Config
+    "get_settings": "database.config",
+    "settings": "database.config",
+    "Settings": "database.config",
+    # Session
+    "get_session": "database.session",
+    "init_db": "database.session",
+    "AsyncSessionLocal": "database.session",
+    # Models
+    "Account": "database.models",
+    "AccountType": "database.models",
+    "Transaction": "database.models",
+    "Posting": "database.models",
+    "Balance": "database.models",
+    "TransactionLink": "database.models",
+    "TransactionTag": "database.models",
+    # Repositories
+    "AccountRepository": "database.repository",
+    "TransactionRepository": "database.repository",
+}
+
+
+def __getattr__(name: str):
+    if name not in _lazy:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_lazy[name]), name)
+    globals()[name] = value  # cache so later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_lazy))
+
 
 __all__ = [
     # Config
     "get_settings",
+    "settings",
     "Settings",
     # Session
     "get_session",
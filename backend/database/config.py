@@ -2,7 +2,8 @@
 Database configuration settings.
 """
 
-from functools import lru_cache
+from functools import cached_property
+from typing import Literal
 
 from pydantic_settings import BaseSettings
 
@@ -16,36 +17,56 @@ class Settings(BaseSettings):
     postgres_host: str = "localhost"
     postgres_port: int = 5432
     postgres_db: str = "ai_money_development"
+    postgres_sslmode: str | None = None
+
+    # Async driver used by SQLAlchemy (asyncpg speaks the binary protocol natively)
+    db_driver: Literal["asyncpg", "psycopg"] = "asyncpg"
 
     # Connection pool settings
     pool_size: int = 5
     max_overflow: int = 10
     pool_timeout: int = 30
+    pool_recycle: int = 1800
+    # Set when connecting through PgBouncer in transaction mode; pooling is
+    # then left to PgBouncer instead of being done twice
+    use_pgbouncer: bool = False
+
+    # Create missing tables at startup (local development only)
+    auto_create_tables: bool = False
 
     # For testing
     testing: bool = False
     test_database_url: str | None = None
 
-    @property
+    # URLs are built on first access and cached; settings are read-only after load
+    @cached_property
     def database_url(self) -> str:
         """Get the async database URL for SQLAlchemy."""
         if self.testing and self.test_database_url:
             return self.test_database_url
-        return (
-            f"postgresql+psycopg://{self.postgres_user}:{self.postgres_password}"
+        url = (
+            f"postgresql+{self.db_driver}://{self.postgres_user}:{self.postgres_password}"
             f"@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
         )
+        if self.postgres_sslmode:
+            # asyncpg takes `ssl=` where libpq-based drivers take `sslmode=`
+            ssl_param = "ssl" if self.db_driver == "asyncpg" else "sslmode"
+            url += f"?{ssl_param}={self.postgres_sslmode}"
+        return url
 
-    @property
+    @cached_property
     def sync_database_url(self) -> str:
         """Get the sync database URL for Alembic migrations."""
         if self.testing and self.test_database_url:
             # Convert async URL to sync
-            return self.test_database_url.replace("+psycopg", "")
-        return (
+            return self.test_database_url.replace(f"+{self.db_driver}", "")
+        url = (
             f"postgresql://{self.postgres_user}:{self.postgres_password}"
             f"@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
         )
+        if self.postgres_sslmode:
+            url += f"?sslmode={self.postgres_sslmode}"
+        return url
 
     class Config:
         env_file = ".env"
@@ -53,7 +74,10 @@ class Settings(BaseSettings):
         extra = "ignore"
 
 
-@lru_cache
+# Built once at import so hot paths pay a plain attribute lookup
+settings = Settings()
+
+
 def get_settings() -> Settings:
-    """Get cached settings instance."""
-    return Settings()
+    """Get the settings instance."""
+    return settings
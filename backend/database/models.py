@@ -6,6 +6,9 @@ This module defines the database schema for:
 - Transactions (transaction headers with metadata)
 - Postings (individual debit/credit entries)
 - Balances (balance assertions)
+
+The schema targets PostgreSQL only: it uses JSONB, generated columns built
+on strpos/regexp_replace, and covering (INCLUDE) indexes.
 """
 
 import enum
@@ -13,28 +16,36 @@ from datetime import date, datetime
 from decimal import Decimal
 from typing import Any
 from typing import Optional
-from uuid import uuid4
+import uuid
 
 from sqlalchemy import (
     Boolean,
+    Computed,
     Date,
     DateTime,
     Enum,
     ForeignKey,
     Index,
-    JSON,
     Numeric,
     String,
     Text,
     UniqueConstraint,
     func,
+    text,
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
 class Base(DeclarativeBase):
-    """Base class for all models."""
+    """
+    Base class for all models.
+
+    Relationships use lazy="raise_on_sql": under asyncio an implicit lazy
+    load cannot run, so queries must eager-load what they need (see the
+    repositories). Child rows are removed by ON DELETE CASCADE in the
+    database (passive_deletes) rather than loaded and deleted by the ORM.
+    """
     pass
 
 
@@ -55,17 +66,30 @@ class Account(Base):
     """
     __tablename__ = "accounts"
 
-    id: Mapped[str] = mapped_column(
-        UUID(as_uuid=False), primary_key=True, default=lambda: str(uuid4())
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
     name: Mapped[str] = mapped_column(String(500), unique=True, nullable=False, index=True)
+    # Derived from name by the database (e.g., 'Assets:Bank' for 'Assets:Bank:Checking')
+    parent_name: Mapped[Optional[str]] = mapped_column(
+        String(500),
+        Computed(
+            "CASE WHEN strpos(name, ':') > 0 THEN regexp_replace(name, ':[^:]*$', '') END",
+            persisted=True,
+        ),
+        index=True,
+    )
+    # Last component of the account name
+    short_name: Mapped[str] = mapped_column(
+        String(500), Computed("regexp_replace(name, '^.*:', '')", persisted=True)
+    )
     account_type: Mapped[AccountType] = mapped_column(Enum(AccountType), nullable=False)
     currency: Mapped[str] = mapped_column(String(10), default="USD", nullable=False)
     open_date: Mapped[date] = mapped_column(Date, nullable=False)
     close_date: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
-    meta: Mapped[Optional[dict[str, Any]]] = mapped_column(JSON, nullable=True, default=None)
+    meta: Mapped[Optional[dict[str, Any]]] = mapped_column(JSONB, nullable=True, default=None)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
@@ -74,26 +98,19 @@ class Account(Base):
     )
 
     postings: Mapped[list["Posting"]] = relationship(
-        back_populates="account", cascade="all, delete-orphan"
+        back_populates="account", cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="raise_on_sql",
     )
     balances: Mapped[list["Balance"]] = relationship(
-        back_populates="account", cascade="all, delete-orphan"
+        back_populates="account", cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="raise_on_sql",
     )
 
     def __repr__(self) -> str:
         return f"<Account(name={self.name}, type={self.account_type.value})>"
 
-    @property
-    def parent_name(self) -> str | None:
-        """Get parent account name (e.g., 'Assets:Bank' for 'Assets:Bank:Checking')."""
-        parts = self.name.rsplit(":", 1)
-        return parts[0] if len(parts) > 1 else None
-
-    @property
-    def short_name(self) -> str:
-        """Get the last component of the account name."""
-        return self.name.rsplit(":", 1)[-1]
-
 
 class Transaction(Base):
     """
@@ -103,15 +120,15 @@ class Transaction(Base):
     """
     __tablename__ = "transactions"
 
-    id: Mapped[str] = mapped_column(
-        UUID(as_uuid=False), primary_key=True, default=lambda: str(uuid4())
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
-    date: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+    date: Mapped[date] = mapped_column(Date, nullable=False)
     # Transaction flag (* for complete, ! for incomplete)
     flag: Mapped[str] = mapped_column(String(1), default="*", nullable=False)
     payee: Mapped[Optional[str]] = mapped_column(String(500), nullable=True, index=True)
     narration: Mapped[str] = mapped_column(Text, nullable=False)
-    meta: Mapped[Optional[dict[str, Any]]] = mapped_column(JSON, nullable=True, default=None)
+    meta: Mapped[Optional[dict[str, Any]]] = mapped_column(JSONB, nullable=True, default=None)
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
@@ -121,17 +138,25 @@ class Transaction(Base):
     )
 
     postings: Mapped[list["Posting"]] = relationship(
-        back_populates="transaction", cascade="all, delete-orphan"
+        back_populates="transaction", cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="raise_on_sql",
     )
     links: Mapped[list["TransactionLink"]] = relationship(
-        back_populates="transaction", cascade="all, delete-orphan"
+        back_populates="transaction", cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="raise_on_sql",
     )
     tags: Mapped[list["TransactionTag"]] = relationship(
-        back_populates="transaction", cascade="all, delete-orphan"
+        back_populates="transaction", cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="raise_on_sql",
     )
 
     __table_args__ = (
         Index("ix_transactions_date_payee", "date", "payee"),
+        # Keyset pagination on (date, id), scanned in either direction
+        Index("ix_transactions_date_id", "date", "id"),
     )
 
     def __repr__(self) -> str:
@@ -140,8 +165,9 @@ class Transaction(Base):
     @property
     def is_balanced(self) -> bool:
         """Check if transaction postings balance to zero."""
-        total = sum(p.amount for p in self.postings if p.amount is not None)
-        return abs(total) < Decimal("0.001")
+        # Amounts have 4 decimal places; sum them as integer ten-thousandths
+        total = sum(int(p.amount * 10000) for p in self.postings if p.amount is not None)
+        return abs(total) < 10  # i.e. less than 0.001
 
 
 class Posting(Base):
@@ -152,21 +178,25 @@ class Posting(Base):
     """
     __tablename__ = "postings"
 
-    id: Mapped[str] = mapped_column(
-        UUID(as_uuid=False), primary_key=True, default=lambda: str(uuid4())
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
     # Foreign keys
-    transaction_id: Mapped[str] = mapped_column(
-        UUID(as_uuid=False), ForeignKey("transactions.id", ondelete="CASCADE"), nullable=False
+    transaction_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("transactions.id", ondelete="CASCADE"), nullable=False
     )
-    account_id: Mapped[str] = mapped_column(
-        UUID(as_uuid=False), ForeignKey("accounts.id", ondelete="CASCADE"), nullable=False
+    account_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("accounts.id", ondelete="CASCADE"), nullable=False
     )
     # Amount (positive for debits, negative for credits in expense/asset accounts)
     # Can be None if auto-computed to balance
     amount: Mapped[Optional[Decimal]] = mapped_column(
         Numeric(precision=20, scale=4), nullable=True
     )
+    # Magnitude of the amount, maintained by the database for indexed range searches
+    abs_amount: Mapped[Optional[Decimal]] = mapped_column(
+        Numeric(precision=20, scale=4), Computed("abs(amount)", persisted=True)
+    )
     # Currency
     currency: Mapped[str] = mapped_column(String(10), default="USD", nullable=False)
     # Cost basis (for investments)
@@ -189,12 +219,24 @@ class Posting(Base):
     )
 
     # Relationships
-    transaction: Mapped["Transaction"] = relationship(back_populates="postings")
-    account: Mapped["Account"] = relationship(back_populates="postings")
+    transaction: Mapped["Transaction"] = relationship(
+        back_populates="postings", lazy="raise_on_sql"
+    )
+    account: Mapped["Account"] = relationship(
+        back_populates="postings", lazy="raise_on_sql"
+    )
 
     __table_args__ = (
-        Index("ix_postings_account_id", "account_id"),
+        # Covers account ledger lookups (also serves plain account_id filters),
+        # and balance sums index-only, with currency checked from the INCLUDE
+        Index(
+            "ix_postings_account_txn",
+            "account_id",
+            "transaction_id",
+            postgresql_include=["amount", "currency"],
+        ),
         Index("ix_postings_transaction_id", "transaction_id"),
+        Index("ix_postings_abs_amount", "abs_amount"),
     )
 
     def __repr__(self) -> str:
@@ -209,12 +251,12 @@ class Balance(Base):
     """
     __tablename__ = "balances"
 
-    id: Mapped[str] = mapped_column(
-        UUID(as_uuid=False), primary_key=True, default=lambda: str(uuid4())
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
     # Foreign key to account
-    account_id: Mapped[str] = mapped_column(
-        UUID(as_uuid=False), ForeignKey("accounts.id", ondelete="CASCADE"), nullable=False
+    account_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("accounts.id", ondelete="CASCADE"), nullable=False
     )
     # Balance assertion date
     date: Mapped[date] = mapped_column(Date, nullable=False)
@@ -224,7 +266,8 @@ class Balance(Base):
     )
     # Currency
     currency: Mapped[str] = mapped_column(String(10), default="USD", nullable=False)
-    # Whether the assertion passed
+    # True for user assertions; False for checkpoints computed from postings
+    # by BalanceRepository.cache_balances
     is_verified: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
 
     # Timestamps
@@ -233,11 +276,22 @@ class Balance(Base):
     )
 
     # Relationships
-    account: Mapped["Account"] = relationship(back_populates="balances")
+    account: Mapped["Account"] = relationship(
+        back_populates="balances", lazy="raise_on_sql"
+    )
 
     __table_args__ = (
         UniqueConstraint("account_id", "date", "currency", name="uq_balance_account_date_currency"),
         Index("ix_balances_account_date", "account_id", "date"),
+        # Matches the DISTINCT ON (account_id, currency) ... date DESC scans for
+        # the latest balance per account and currency, read index-only
+        Index(
+            "ix_balance_latest",
+            "account_id",
+            "currency",
+            text("date DESC"),
+            postgresql_include=["amount", "id", "is_verified"],
+        ),
     )
 
     def __repr__(self) -> str:
@@ -247,8 +301,8 @@ class Balance(Base):
 class ExchangeRate(Base):
     __tablename__ = "exchange_rates"
 
-    id: Mapped[str] = mapped_column(
-        UUID(as_uuid=False), primary_key=True, default=lambda: str(uuid4())
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
     date: Mapped[date] = mapped_column(Date, nullable=False, index=True)
     from_currency: Mapped[str] = mapped_column(String(10), nullable=False, index=True)
@@ -268,7 +322,14 @@ class ExchangeRate(Base):
     __table_args__ = (
         UniqueConstraint("date", "from_currency", "to_currency",
                         name="uq_exchange_rate_date_currencies"),
-        Index("ix_exchange_rates_currencies", "from_currency", "to_currency"),
+        # Covers latest-rate lookups: newest date per pair, rate read from the index
+        Index(
+            "ix_exchange_rates_pair_date",
+            "from_currency",
+            "to_currency",
+            "date",
+            postgresql_include=["rate"],
+        ),
     )
 
     def __repr__(self) -> str:
@@ -283,17 +344,19 @@ class TransactionLink(Base):
     """
     __tablename__ = "transaction_links"
 
-    id: Mapped[str] = mapped_column(
-        UUID(as_uuid=False), primary_key=True, default=lambda: str(uuid4())
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
-    transaction_id: Mapped[str] = mapped_column(
-        UUID(as_uuid=False), ForeignKey("transactions.id", ondelete="CASCADE"), nullable=False
+    transaction_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("transactions.id", ondelete="CASCADE"), nullable=False
     )
     # Link value (without the ^ prefix)
     link: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
 
     # Relationships
-    transaction: Mapped["Transaction"] = relationship(back_populates="links")
+    transaction: Mapped["Transaction"] = relationship(
+        back_populates="links", lazy="raise_on_sql"
+    )
 
     __table_args__ = (
         UniqueConstraint("transaction_id", "link", name="uq_transaction_link"),
@@ -308,17 +371,19 @@ class TransactionTag(Base):
     """
     __tablename__ = "transaction_tags"
 
-    id: Mapped[str] = mapped_column(
-        UUID(as_uuid=False), primary_key=True, default=lambda: str(uuid4())
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
-    transaction_id: Mapped[str] = mapped_column(
-        UUID(as_uuid=False), ForeignKey("transactions.id", ondelete="CASCADE"), nullable=False
+    transaction_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("transactions.id", ondelete="CASCADE"), nullable=False
     )
     # Tag value (without the # prefix)
     tag: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
 
     # Relationships
-    transaction: Mapped["Transaction"] = relationship(back_populates="tags")
+    transaction: Mapped["Transaction"] = relationship(
+        back_populates="tags", lazy="raise_on_sql"
+    )
 
     __table_args__ = (
         UniqueConstraint("transaction_id", "tag", name="uq_transaction_tag"),
@@ -4,15 +4,37 @@ Repository pattern for database operations.
 Provides clean abstractions for CRUD operations on accounting entities.
 """
 
+from collections.abc import AsyncIterator
 from datetime import date
 from decimal import Decimal
 from typing import Any
-
-from sqlalchemy import select, func, and_, or_
+from uuid import UUID
+
+from sqlalchemy import (
+    event,
+    delete,
+    select,
+    insert,
+    func,
+    lambda_stmt,
+    tuple_,
+    and_,
+    or_,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import (
+    Session,
+    aliased,
+    contains_eager,
+    joinedload,
+    raiseload,
+    selectinload,
+)
+from sqlalchemy.orm.attributes import set_committed_value
 
 from database.models import (
+    Base,
     Account,
     AccountType,
     Balance,
@@ -24,12 +46,124 @@ from database.models import (
 )
 
 
+# Relationships load with raise_on_sql, so every query returning transactions
+# to callers eager-loads the full graph: 1 + 3 queries regardless of row count.
+# raiseload("*") keeps any relationship added later from lazy loading here.
+_TRANSACTION_LOADS = (
+    selectinload(Transaction.postings).selectinload(Posting.account),
+    selectinload(Transaction.tags),
+    selectinload(Transaction.links),
+    raiseload("*"),
+)
+
+
+def _query_with_full_graph(stmt, flat: bool = False):
+    """
+    Attach the full transaction graph loaders to a SELECT of Transaction.
+
+    By default uses selectinload (1 + 3 queries, no row explosion). With
+    flat=True the graph is fetched in the same statement through outer joins
+    and contains_eager, which saves round trips for single-record lookups.
+    Callers must then call .unique() on the result.
+    """
+    if not flat:
+        return stmt.options(*_TRANSACTION_LOADS)
+
+    # Aliased so filter joins in the base statement don't narrow the collections
+    postings = aliased(Posting)
+    account = aliased(Account)
+    tags = aliased(TransactionTag)
+    links = aliased(TransactionLink)
+    return (
+        stmt.outerjoin(Transaction.postings.of_type(postings))
+        .outerjoin(postings.account.of_type(account))
+        .outerjoin(Transaction.tags.of_type(tags))
+        .outerjoin(Transaction.links.of_type(links))
+        .options(
+            contains_eager(Transaction.postings.of_type(postings)).contains_eager(
+                postings.account.of_type(account)
+            ),
+            contains_eager(Transaction.tags.of_type(tags)),
+            contains_eager(Transaction.links.of_type(links)),
+            raiseload("*"),
+        )
+        .execution_options(populate_existing=True)
+    )
+
+
+# Rows fetched per round trip by the iter_* streaming methods
+_STREAM_BATCH_SIZE = 500
+
+# Accounts resolved by name, kept in session.info so every AccountRepository
+# on the same session shares it; bulk imports look up the same few names often
+_ACCOUNT_NAME_CACHE = "account_name_cache"
+# Exchange rates resolved per (from, to, as_of_date); conversion loops ask for
+# the same pair and day over and over
+_EXCHANGE_RATE_CACHE = "exchange_rate_cache"
+
+
+# after_soft_rollback fires for every rollback, savepoints included, even
+# when no DBAPI-level rollback is emitted (unlike after_rollback)
+@event.listens_for(Session, "after_soft_rollback")
+def _clear_session_caches(session: Session, previous_transaction) -> None:
+    """Drop cached rows that may have been written in a rolled-back transaction."""
+    session.info.pop(_ACCOUNT_NAME_CACHE, None)
+    session.info.pop(_EXCHANGE_RATE_CACHE, None)
+
+
+async def _upsert(
+    session: AsyncSession,
+    model: type[Base],
+    values: dict[str, Any],
+    conflict_cols: list[str],
+    update_cols: list[str],
+):
+    """
+    Insert a row, or update update_cols from it on a unique conflict.
+
+    Runs as a single INSERT ... ON CONFLICT DO UPDATE ... RETURNING and
+    returns the resulting ORM instance.
+    """
+    stmt = pg_insert(model).values(**values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=conflict_cols,
+        set_={col: stmt.excluded[col] for col in update_cols},
+    ).returning(model)
+    result = await session.scalars(
+        stmt, execution_options={"populate_existing": True}
+    )
+    return result.one()
+
+
+def _as_decimal(value: Any) -> Decimal | None:
+    """Pass Decimals and None through; convert other numbers exactly via str()."""
+    if value is None or isinstance(value, Decimal):
+        return value
+    return Decimal(str(value))
+
+
+def _account_type_for(name: str) -> AccountType:
+    """Derive the account type from the first component of an account name."""
+    first_component = name.partition(":")[0]
+    try:
+        return AccountType(first_component)
+    except ValueError:
+        raise ValueError(
+            f"Invalid account type '{first_component}'. "
+            f"Must be one of: {[t.value for t in AccountType]}"
+        )
+
+
 class AccountRepository:
     """Repository for Account operations."""
 
     def __init__(self, session: AsyncSession):
         self.session = session
 
+    @property
+    def _name_cache(self) -> dict[str, Account]:
+        return self.session.info.setdefault(_ACCOUNT_NAME_CACHE, {})
+
     async def create(
         self,
         name: str,
@@ -51,19 +185,9 @@ class AccountRepository:
         Returns:
             The created Account instance
         """
-        # Derive account type from the first component
-        first_component = name.split(":")[0]
-        try:
-            account_type = AccountType(first_component)
-        except ValueError:
-            raise ValueError(
-                f"Invalid account type '{first_component}'. "
-                f"Must be one of: {[t.value for t in AccountType]}"
-            )
-
         account = Account(
             name=name,
-            account_type=account_type,
+            account_type=_account_type_for(name),
             currency=currency,
             open_date=open_date,
             description=description,
@@ -71,21 +195,64 @@ class AccountRepository:
         )
         self.session.add(account)
         await self.session.flush()
+        self._name_cache[name] = account
         return account
 
-    async def get_by_id(self, account_id: str) -> Account | None:
+    async def create_many(self, rows: list[dict]) -> list[Account]:
+        """
+        Create several accounts in a single flush.
+
+        Args:
+            rows: Dicts with the keyword arguments accepted by create()
+
+        Returns:
+            The created Account instances, in input order
+        """
+        accounts = [
+            Account(
+                name=row["name"],
+                account_type=_account_type_for(row["name"]),
+                currency=row.get("currency", "USD"),
+                open_date=row["open_date"],
+                description=row.get("description"),
+                meta=row.get("meta"),
+            )
+            for row in rows
+        ]
+        self.session.add_all(accounts)
+        await self.session.flush()
+        self._name_cache.update((account.name, account) for account in accounts)
+        return accounts
+
+    async def get_by_id(self, account_id: UUID) -> Account | None:
         """Get an account by ID."""
         result = await self.session.execute(
-            select(Account).where(Account.id == account_id)
+            lambda_stmt(lambda: select(Account).where(Account.id == account_id))
         )
         return result.scalar_one_or_none()
 
+    async def get_type_and_name(self, account_id: UUID) -> tuple[AccountType, str] | None:
+        """Get just the type and name of an account, without loading the ORM row."""
+        result = await self.session.execute(
+            lambda_stmt(
+                lambda: select(Account.account_type, Account.name).where(Account.id == account_id)
+            )
+        )
+        row = result.one_or_none()
+        return tuple(row) if row is not None else None
+
     async def get_by_name(self, name: str) -> Account | None:
         """Get an account by its full name."""
+        account = self._name_cache.get(name)
+        if account is not None:
+            return account
         result = await self.session.execute(
-            select(Account).where(Account.name == name)
+            lambda_stmt(lambda: select(Account).where(Account.name == name))
         )
-        return result.scalar_one_or_none()
+        account = result.scalar_one_or_none()
+        if account is not None:
+            self._name_cache[name] = account
+        return account
 
     async def get_or_create(
         self,
@@ -100,11 +267,25 @@ class AccountRepository:
         Returns:
             Tuple of (account, created) where created is True if new
         """
-        account = await self.get_by_name(name)
+        # Insert-or-skip in one statement; concurrent callers can't both create
+        result = await self.session.scalars(
+            pg_insert(Account)
+            .values(
+                name=name,
+                account_type=_account_type_for(name),
+                currency=currency,
+                open_date=open_date,
+                description=description,
+            )
+            .on_conflict_do_nothing(index_elements=[Account.name])
+            .returning(Account)
+        )
+        account = result.one_or_none()
         if account:
-            return account, False
-        account = await self.create(name, open_date, currency, description)
-        return account, True
+            self._name_cache[name] = account
+            return account, True
+        # Name already taken: return the existing account
+        return await self.get_by_name(name), False
 
     async def list_all(
         self,
@@ -121,15 +302,35 @@ class AccountRepository:
         Returns:
             List of Account instances
         """
+        result = await self.session.execute(
+            self._list_all_query(account_type, is_active)
+        )
+        return list(result.scalars().all())
+
+    async def iter_all(
+        self,
+        account_type: AccountType | None = None,
+        is_active: bool | None = None,
+    ) -> AsyncIterator[Account]:
+        """Stream accounts in batches; same filters and order as list_all."""
+        result = await self.session.stream_scalars(
+            self._list_all_query(account_type, is_active).execution_options(
+                yield_per=_STREAM_BATCH_SIZE
+            )
+        )
+        async for account in result:
+            yield account
+
+    def _list_all_query(
+        self, account_type: AccountType | None, is_active: bool | None
+    ):
         query = select(Account).order_by(Account.name)
 
         if account_type is not None:
             query = query.where(Account.account_type == account_type)
         if is_active is not None:
             query = query.where(Account.is_active == is_active)
-
-        result = await self.session.execute(query)
-        return list(result.scalars().all())
+        return query
 
     async def list_by_prefix(self, prefix: str) -> list[Account]:
         """
@@ -141,14 +342,66 @@ class AccountRepository:
         Returns:
             List of Account instances
         """
-        result = await self.session.execute(
+        result = await self.session.execute(self._prefix_query(prefix))
+        return list(result.scalars().all())
+
+    async def iter_by_prefix(self, prefix: str) -> AsyncIterator[Account]:
+        """Stream accounts matching a name prefix in batches."""
+        result = await self.session.stream_scalars(
+            self._prefix_query(prefix).execution_options(yield_per=_STREAM_BATCH_SIZE)
+        )
+        async for account in result:
+            yield account
+
+    def _prefix_query(self, prefix: str):
+        return (
             select(Account)
             .where(Account.name.startswith(prefix))
             .order_by(Account.name)
         )
-        return list(result.scalars().all())
 
-    async def close_account(self, account_id: str, close_date: date) -> Account | None:
+    async def list_networth_with_balances(
+        self, as_of_date: date | None = None
+    ) -> list[tuple[Account, Decimal | None]]:
+        """
+        List active Assets and Liabilities accounts with their latest balance.
+
+        The balance is the most recent Balance entry on or before as_of_date
+        (default: today) in the account's own currency, or None if there is
+        none. Assets come first, each group ordered by name.
+        """
+        if as_of_date is None:
+            as_of_date = date.today()
+
+        latest_amount = (
+            select(Balance.amount)
+            .where(
+                and_(
+                    Balance.account_id == Account.id,
+                    Balance.currency == Account.currency,
+                    Balance.date <= as_of_date,
+                    Balance.is_verified.is_(True),
+                )
+            )
+            .order_by(Balance.date.desc())
+            .limit(1)
+            .correlate(Account)
+            .scalar_subquery()
+        )
+        result = await self.session.execute(
+            select(Account, latest_amount)
+            .where(
+                and_(
+                    Account.account_type.in_([AccountType.ASSETS, AccountType.LIABILITIES]),
+                    Account.is_active.is_(True),
+                )
+            )
+            # Enum values sort in declaration order: Assets before Liabilities
+            .order_by(Account.account_type, Account.name)
+        )
+        return [(account, amount) for account, amount in result.all()]
+
+    async def close_account(self, account_id: UUID, close_date: date) -> Account | None:
         """
         Close an account.
 
@@ -164,17 +417,24 @@ class AccountRepository:
             account.close_date = close_date
             account.is_active = False
             await self.session.flush()
+            self._name_cache.pop(account.name, None)
         return account
 
     async def get_balance(
         self,
-        account_id: str,
+        account_id: UUID,
         as_of_date: date | None = None,
         currency: str = "USD",
     ) -> Decimal:
         """
         Calculate account balance from postings.
 
+        The latest checkpoint written by BalanceRepository.cache_balances on
+        or before as_of_date is used as a starting point (it holds the balance
+        at the start of its date, as in Beancount), so only postings from that
+        date onward are summed. User assertions are not postings and are
+        ignored.
+
         Args:
             account_id: Account ID
             as_of_date: Calculate balance as of this date (default: today)
@@ -186,8 +446,26 @@ class AccountRepository:
         if as_of_date is None:
             as_of_date = date.today()
 
-        result = await self.session.execute(
-            select(func.coalesce(func.sum(Posting.amount), 0))
+        checkpoint = (
+            await self.session.execute(
+                lambda_stmt(
+                    lambda: select(Balance.amount, Balance.date)
+                    .where(
+                        and_(
+                            Balance.account_id == account_id,
+                            Balance.currency == currency,
+                            Balance.date <= as_of_date,
+                            Balance.is_verified.is_(False),
+                        )
+                    )
+                    .order_by(Balance.date.desc())
+                    .limit(1)
+                )
+            )
+        ).first()
+
+        stmt = lambda_stmt(
+            lambda: select(func.coalesce(func.sum(Posting.amount), 0))
             .join(Transaction)
             .where(
                 and_(
@@ -197,9 +475,15 @@ class AccountRepository:
                 )
             )
         )
-        return result.scalar() or Decimal(0)
+        base = Decimal(0)
+        if checkpoint is not None:
+            base, base_date = checkpoint
+            stmt += lambda s: s.where(Transaction.date >= base_date)
+
+        result = await self.session.execute(stmt)
+        return base + (result.scalar() or Decimal(0))
 
-    async def delete(self, account_id: str) -> bool:
+    async def delete(self, account_id: UUID) -> bool:
         """
         Delete an account.
 
@@ -209,12 +493,15 @@ class AccountRepository:
         Returns:
             True if deleted, False if not found
         """
-        account = await self.get_by_id(account_id)
-        if account:
-            await self.session.delete(account)
-            await self.session.flush()
-            return True
-        return False
+        # Postings and balances are removed by ON DELETE CASCADE
+        result = await self.session.execute(
+            delete(Account).where(Account.id == account_id).returning(Account.name)
+        )
+        name = result.scalar_one_or_none()
+        if name is None:
+            return False
+        self._name_cache.pop(name, None)
+        return True
 
 
 class TransactionRepository:
@@ -242,7 +529,8 @@ class TransactionRepository:
             narration: Transaction description
             postings: List of posting dicts with keys:
                 - account_id: Account ID
-                - amount: Decimal amount (can be None for auto-balance)
+                - amount: Decimal amount (can be None for auto-balance);
+                  other numbers are converted via str()
                 - currency: Currency code (default: USD)
             payee: Optional payee name
             flag: Transaction flag (* or !)
@@ -256,6 +544,18 @@ class TransactionRepository:
         Raises:
             ValueError: If postings don't balance
         """
+        # Calculate auto-balance if needed
+        amounts = [_as_decimal(posting_data.get("amount")) for posting_data in postings]
+        auto_balance = [i for i, amount in enumerate(amounts) if amount is None]
+        if len(auto_balance) > 1:
+            raise ValueError("Only one posting can have auto-balance (None amount)")
+        auto_balance_posting = auto_balance[0] if auto_balance else None
+        total = sum((amount for amount in amounts if amount is not None), start=Decimal(0))
+
+        # Validate balance before touching the database
+        if auto_balance_posting is None and abs(total) >= Decimal("0.001"):
+            raise ValueError(f"Transaction postings do not balance: {total}")
+
         # Create transaction
         transaction = Transaction(
             date=date,
@@ -267,56 +567,102 @@ class TransactionRepository:
         self.session.add(transaction)
         await self.session.flush()  # Get transaction ID
 
-        # Calculate auto-balance if needed
-        total = Decimal(0)
-        auto_balance_posting = None
-        for i, posting_data in enumerate(postings):
-            amount = posting_data.get("amount")
-            if amount is None:
-                if auto_balance_posting is not None:
-                    raise ValueError("Only one posting can have auto-balance (None amount)")
-                auto_balance_posting = i
+        # Create postings in one executemany INSERT, returning the ORM rows
+        result = await self.session.scalars(
+            insert(Posting).returning(Posting, sort_by_parameter_order=True),
+            [
+                {
+                    "transaction_id": transaction.id,
+                    "account_id": posting_data["account_id"],
+                    "amount": -total if i == auto_balance_posting else amounts[i],
+                    "currency": posting_data.get("currency", "USD"),
+                    "position": i,
+                }
+                for i, posting_data in enumerate(postings)
+            ],
+        )
+        created_postings = list(result.all())
+
+        # Accounts are usually already in the session; load the rest at once
+        accounts = {}
+        missing = set()
+        for posting in created_postings:
+            key = self.session.identity_key(Account, posting.account_id)
+            account = self.session.identity_map.get(key)
+            if account is None:
+                missing.add(posting.account_id)
             else:
-                total += Decimal(str(amount))
-
-        # Create postings
-        for i, posting_data in enumerate(postings):
-            amount = posting_data.get("amount")
-            if i == auto_balance_posting:
-                amount = -total  # Auto-balance
-
-            posting = Posting(
-                transaction_id=transaction.id,
-                account_id=posting_data["account_id"],
-                amount=amount,
-                currency=posting_data.get("currency", "USD"),
-                position=i,
+                accounts[posting.account_id] = account
+        if missing:
+            result = await self.session.scalars(
+                select(Account).where(Account.id.in_(missing))
             )
-            self.session.add(posting)
+            accounts.update((account.id, account) for account in result)
 
-        # Validate balance
-        if auto_balance_posting is None and abs(total) >= Decimal("0.001"):
-            raise ValueError(f"Transaction postings do not balance: {total}")
+        await self._drop_cached_balances(
+            date, {(posting.account_id, posting.currency) for posting in created_postings}
+        )
 
-        # Add tags
-        if tags:
-            for tag in tags:
-                tag_obj = TransactionTag(transaction_id=transaction.id, tag=tag)
-                self.session.add(tag_obj)
+        for posting in created_postings:
+            set_committed_value(posting, "transaction", transaction)
+            set_committed_value(posting, "account", accounts[posting.account_id])
 
-        # Add links
-        if links:
-            for link in links:
-                link_obj = TransactionLink(transaction_id=transaction.id, link=link)
-                self.session.add(link_obj)
+        # Populate the relationships directly instead of re-fetching the graph
+        set_committed_value(transaction, "postings", created_postings)
+        set_committed_value(transaction, "tags", await self.add_tags(transaction.id, tags or []))
+        set_committed_value(
+            transaction, "links", await self.add_links(transaction.id, links or [])
+        )
+        return transaction
 
-        await self.session.flush()
+    async def add_tags(self, transaction_id: UUID, tags: list[str]) -> list[TransactionTag]:
+        """
+        Attach tags to a transaction in a single INSERT.
+
+        Tags the transaction already has are skipped.
+
+        Args:
+            transaction_id: Transaction ID
+            tags: Tag values (without the # prefix)
 
-        # Re-fetch with eager loading to avoid lazy loading issues
-        return await self.get_by_id(transaction.id)
+        Returns:
+            The newly created TransactionTag instances
+        """
+        if not tags:
+            return []
+        result = await self.session.scalars(
+            pg_insert(TransactionTag)
+            .values([{"transaction_id": transaction_id, "tag": tag} for tag in tags])
+            .on_conflict_do_nothing(index_elements=["transaction_id", "tag"])
+            .returning(TransactionTag)
+        )
+        return list(result.all())
+
+    async def add_links(self, transaction_id: UUID, links: list[str]) -> list[TransactionLink]:
+        """
+        Attach links to a transaction in a single INSERT.
+
+        Links the transaction already has are skipped.
+
+        Args:
+            transaction_id: Transaction ID
+            links: Link values (without the ^ prefix)
+
+        Returns:
+            The newly created TransactionLink instances
+        """
+        if not links:
+            return []
+        result = await self.session.scalars(
+            pg_insert(TransactionLink)
+            .values([{"transaction_id": transaction_id, "link": link} for link in links])
+            .on_conflict_do_nothing(index_elements=["transaction_id", "link"])
+            .returning(TransactionLink)
+        )
+        return list(result.all())
 
     async def get_by_id(
-        self, transaction_id: str, include_postings: bool = True
+        self, transaction_id: UUID, include_postings: bool = True
     ) -> Transaction | None:
         """
         Get a transaction by ID.
@@ -331,14 +677,29 @@ class TransactionRepository:
         query = select(Transaction).where(Transaction.id == transaction_id)
 
         if include_postings:
-            query = query.options(
-                selectinload(Transaction.postings).selectinload(Posting.account),
-                selectinload(Transaction.tags),
-                selectinload(Transaction.links),
-            )
+            query = _query_with_full_graph(query, flat=True)
 
         result = await self.session.execute(query)
-        return result.scalar_one_or_none()
+        return result.unique().scalar_one_or_none()
+
+    async def get_by_ids(self, transaction_ids: list[UUID]) -> dict[UUID, Transaction]:
+        """
+        Get several transactions by ID in one query, with their full graph.
+
+        Args:
+            transaction_ids: Transaction IDs
+
+        Returns:
+            Dict of ID -> Transaction for the IDs that exist
+        """
+        if not transaction_ids:
+            return {}
+        result = await self.session.execute(
+            _query_with_full_graph(
+                select(Transaction).where(Transaction.id.in_(transaction_ids))
+            )
+        )
+        return {transaction.id: transaction for transaction in result.scalars()}
 
     async def get_by_link(self, link: str) -> list[Transaction]:
         """
@@ -351,13 +712,10 @@ class TransactionRepository:
             List of Transaction instances
         """
         result = await self.session.execute(
-            select(Transaction)
-            .join(TransactionLink)
-            .where(TransactionLink.link == link)
-            .options(
-                selectinload(Transaction.postings).selectinload(Posting.account),
-                selectinload(Transaction.tags),
-                selectinload(Transaction.links),
+            _query_with_full_graph(
+                select(Transaction)
+                .join(TransactionLink)
+                .where(TransactionLink.link == link)
             )
         )
         return list(result.scalars().all())
@@ -366,7 +724,9 @@ class TransactionRepository:
         self,
         start_date: date,
         end_date: date,
-        account_id: str | None = None,
+        account_id: UUID | None = None,
+        after: tuple[date, UUID] | None = None,
+        limit: int | None = None,
     ) -> list[Transaction]:
         """
         List transactions in a date range.
@@ -375,10 +735,47 @@ class TransactionRepository:
             start_date: Start date (inclusive)
             end_date: End date (inclusive)
             account_id: Optional filter by account
+            after: Keyset cursor; (date, id) of the last transaction of the
+                previous page
+            limit: Maximum results to return
 
         Returns:
-            List of Transaction instances ordered by date
+            List of Transaction instances ordered by date, then id
+        """
+        result = await self.session.execute(
+            self._date_range_query(start_date, end_date, account_id, after, limit)
+        )
+        return list(result.scalars().all())
+
+    async def iter_by_date_range(
+        self,
+        start_date: date,
+        end_date: date,
+        account_id: UUID | None = None,
+        after: tuple[date, UUID] | None = None,
+    ) -> AsyncIterator[Transaction]:
+        """
+        Stream transactions in a date range in batches.
+
+        Same filters and order as list_by_date_range, but only one batch of
+        transactions (with their postings, tags and links) is held at a time.
         """
+        result = await self.session.stream_scalars(
+            self._date_range_query(start_date, end_date, account_id, after).execution_options(
+                yield_per=_STREAM_BATCH_SIZE
+            )
+        )
+        async for transaction in result:
+            yield transaction
+
+    def _date_range_query(
+        self,
+        start_date: date,
+        end_date: date,
+        account_id: UUID | None,
+        after: tuple[date, UUID] | None,
+        limit: int | None = None,
+    ):
         query = (
             select(Transaction)
             .where(
@@ -387,19 +784,20 @@ class TransactionRepository:
                     Transaction.date <= end_date,
                 )
             )
-            .options(
-                selectinload(Transaction.postings).selectinload(Posting.account),
-                selectinload(Transaction.tags),
-                selectinload(Transaction.links),
-            )
-            .order_by(Transaction.date)
+            .order_by(Transaction.date, Transaction.id)
+            .limit(limit)
         )
 
+        if after is not None:
+            query = query.where(tuple_(Transaction.date, Transaction.id) > after)
+
         if account_id:
-            query = query.join(Posting).where(Posting.account_id == account_id)
+            # EXISTS rather than a join, so each transaction is returned once
+            query = query.where(
+                Transaction.postings.any(Posting.account_id == account_id)
+            )
 
-        result = await self.session.execute(query)
-        return list(result.scalars().unique().all())
+        return _query_with_full_graph(query)
 
     async def search(
         self,
@@ -408,6 +806,7 @@ class TransactionRepository:
         tag: str | None = None,
         min_amount: Decimal | None = None,
         max_amount: Decimal | None = None,
+        after: tuple[date, UUID] | None = None,
         limit: int = 100,
     ) -> list[Transaction]:
         """
@@ -419,22 +818,22 @@ class TransactionRepository:
             tag: Filter by tag
             min_amount: Minimum absolute posting amount
             max_amount: Maximum absolute posting amount
+            after: Keyset cursor; (date, id) of the last transaction of the
+                previous page
             limit: Maximum results to return
 
         Returns:
-            List of Transaction instances
+            List of Transaction instances, newest first
         """
         query = (
             select(Transaction)
-            .options(
-                selectinload(Transaction.postings).selectinload(Posting.account),
-                selectinload(Transaction.tags),
-                selectinload(Transaction.links),
-            )
-            .order_by(Transaction.date.desc())
+            .order_by(Transaction.date.desc(), Transaction.id.desc())
             .limit(limit)
         )
 
+        if after is not None:
+            query = query.where(tuple_(Transaction.date, Transaction.id) < after)
+
         if query_text:
             query = query.where(
                 or_(
@@ -452,18 +851,18 @@ class TransactionRepository:
         if min_amount is not None or max_amount is not None:
             query = query.join(Posting)
             if min_amount is not None:
-                query = query.where(func.abs(Posting.amount) >= min_amount)
+                query = query.where(Posting.abs_amount >= min_amount)
             if max_amount is not None:
-                query = query.where(func.abs(Posting.amount) <= max_amount)
+                query = query.where(Posting.abs_amount <= max_amount)
 
-        result = await self.session.execute(query)
+        result = await self.session.execute(_query_with_full_graph(query))
         return list(result.scalars().unique().all())
 
     async def update_posting_account(
         self,
-        transaction_id: str,
-        old_account_id: str,
-        new_account_id: str,
+        transaction_id: UUID,
+        old_account_id: UUID,
+        new_account_id: UUID,
     ) -> Transaction | None:
         """
         Update a posting's account (useful for recategorization).
@@ -483,12 +882,16 @@ class TransactionRepository:
         for posting in transaction.postings:
             if posting.account_id == old_account_id:
                 posting.account_id = new_account_id
+                await self._drop_cached_balances(
+                    transaction.date,
+                    {(old_account_id, posting.currency), (new_account_id, posting.currency)},
+                )
                 break
 
         await self.session.flush()
         return transaction
 
-    async def delete(self, transaction_id: str) -> bool:
+    async def delete(self, transaction_id: UUID) -> bool:
         """
         Delete a transaction and its postings.
 
@@ -498,16 +901,90 @@ class TransactionRepository:
         Returns:
             True if deleted, False if not found
         """
-        transaction = await self.get_by_id(transaction_id, include_postings=False)
-        if transaction:
-            await self.session.delete(transaction)
-            await self.session.flush()
-            return True
-        return False
+        affected = (
+            await self.session.execute(
+                select(Transaction.date, Posting.account_id, Posting.currency)
+                .join(Posting)
+                .where(Transaction.id == transaction_id)
+            )
+        ).all()
+
+        # Postings, tags and links are removed by ON DELETE CASCADE
+        result = await self.session.execute(
+            delete(Transaction)
+            .where(Transaction.id == transaction_id)
+            .returning(Transaction.id)
+        )
+        if affected:
+            await self._drop_cached_balances(
+                affected[0].date,
+                {(account_id, currency) for _, account_id, currency in affected},
+            )
+        return result.scalar_one_or_none() is not None
+
+    async def _drop_cached_balances(
+        self, changed_date: date, keys: set[tuple[UUID, str]]
+    ) -> None:
+        """
+        Delete computed balance checkpoints invalidated by a posting change.
+
+        A checkpoint dated D sums postings before D, so a change on
+        changed_date makes every later checkpoint of the touched account and
+        currency stale. User assertions (is_verified) are left alone.
+        """
+        await self.session.execute(
+            delete(Balance).where(
+                and_(
+                    Balance.is_verified.is_(False),
+                    Balance.date > changed_date,
+                    tuple_(Balance.account_id, Balance.currency).in_(keys),
+                )
+            )
+        )
+
+    async def is_balanced(self, transaction_id: UUID) -> bool:
+        """
+        Check in SQL whether a transaction's postings sum to zero.
+
+        Args:
+            transaction_id: Transaction ID
+
+        Returns:
+            True if the postings balance (or there are none)
+        """
+        balanced = await self.check_balanced([transaction_id])
+        return balanced.get(transaction_id, True)
+
+    async def check_balanced(self, transaction_ids: list[UUID]) -> dict[UUID, bool]:
+        """
+        Check balance for many transactions with a single GROUP BY query.
+
+        Args:
+            transaction_ids: Transaction IDs to check
+
+        Returns:
+            Dict mapping transaction ID to whether its postings balance.
+            Transactions without postings are omitted.
+        """
+        if not transaction_ids:
+            return {}
+
+        result = await self.session.execute(
+            select(
+                Posting.transaction_id,
+                func.coalesce(func.sum(Posting.amount), 0),
+            )
+            .where(Posting.transaction_id.in_(transaction_ids))
+            .group_by(Posting.transaction_id)
+        )
+        return {
+            transaction_id: abs(total) < Decimal("0.001")
+            for transaction_id, total in result.all()
+        }
 
     async def get_account_statement(
         self,
-        account_id: str,
+        account_id: UUID,
         start_date: date,
         end_date: date,
     ) -> list[dict]:
@@ -522,49 +999,71 @@ class TransactionRepository:
         Returns:
             List of statement entries with running balance
         """
-        # Get opening balance
-        opening_balance = await self._calculate_balance_before_date(
-            account_id, start_date
+        result = await self.session.execute(
+            self._statement_query(account_id, start_date, end_date)
         )
+        return [dict(row) for row in result.mappings()]
 
-        # Get transactions in date range
-        transactions = await self.list_by_date_range(start_date, end_date, account_id)
-
-        # Build statement with running balance
-        statement = []
-        running_balance = opening_balance
-
-        for txn in transactions:
-            for posting in txn.postings:
-                if posting.account_id == account_id:
-                    running_balance += posting.amount or Decimal(0)
-                    statement.append({
-                        "date": txn.date,
-                        "narration": txn.narration,
-                        "payee": txn.payee,
-                        "amount": posting.amount,
-                        "currency": posting.currency,
-                        "balance": running_balance,
-                        "transaction_id": txn.id,
-                    })
+    async def iter_account_statement(
+        self,
+        account_id: UUID,
+        start_date: date,
+        end_date: date,
+    ) -> AsyncIterator[dict]:
+        """Stream account statement entries; same rows as get_account_statement."""
+        result = await self.session.stream(
+            self._statement_query(account_id, start_date, end_date).execution_options(
+                yield_per=_STREAM_BATCH_SIZE
+            )
+        )
+        async for row in result.mappings():
+            yield dict(row)
 
-        return statement
+    def _statement_query(self, account_id: UUID, start_date: date, end_date: date):
+        # Opening balance and running sum are computed server-side in one query
+        opening = (
+            select(func.coalesce(func.sum(Posting.amount), 0).label("amount"))
+            .join(Transaction)
+            .where(
+                and_(
+                    Posting.account_id == account_id,
+                    Transaction.date < start_date,
+                )
+            )
+            .cte("opening")
+        )
+        ordering = (
+            Transaction.date,
+            Transaction.created_at,
+            Transaction.id,
+            Posting.position,
+        )
+        running_total = func.sum(func.coalesce(Posting.amount, 0)).over(
+            order_by=ordering, rows=(None, 0)
+        )
 
-    async def _calculate_balance_before_date(
-        self, account_id: str, before_date: date
-    ) -> Decimal:
-        """Calculate account balance before a given date."""
-        result = await self.session.execute(
-            select(func.coalesce(func.sum(Posting.amount), 0))
+        return (
+            select(
+                Transaction.date,
+                Transaction.narration,
+                Transaction.payee,
+                Posting.amount,
+                Posting.currency,
+                (select(opening.c.amount).scalar_subquery() + running_total).label(
+                    "balance"
+                ),
+                Transaction.id.label("transaction_id"),
+            )
             .join(Transaction)
             .where(
                 and_(
                     Posting.account_id == account_id,
-                    Transaction.date < before_date,
+                    Transaction.date >= start_date,
+                    Transaction.date <= end_date,
                 )
             )
+            .order_by(*ordering)
         )
-        return result.scalar() or Decimal(0)
 
 
 class BalanceRepository:
@@ -573,84 +1072,167 @@ class BalanceRepository:
 
     async def create_or_update(
         self,
-        account_id: str,
+        account_id: UUID,
         date: date,
         amount: Decimal,
         currency: str,
     ) -> Balance:
-        existing = await self.session.execute(
-            select(Balance).where(
-                and_(
-                    Balance.account_id == account_id,
-                    Balance.date == date,
-                    Balance.currency == currency,
-                )
+        return await _upsert(
+            self.session,
+            Balance,
+            {
+                "account_id": account_id,
+                "date": date,
+                "amount": amount,
+                "currency": currency,
+                "is_verified": True,
+            },
+            conflict_cols=["account_id", "date", "currency"],
+            # A user assertion replaces a computed checkpoint on the same day
+            update_cols=["amount", "is_verified"],
+        )
+
+    async def cache_balances(self, as_of_date: date) -> None:
+        """
+        Record posting totals as balance checkpoints dated as_of_date.
+
+        Each row holds the sum of postings before as_of_date per account and
+        currency, so AccountRepository.get_balance only has to add newer
+        postings. Meant to run periodically; existing assertions are kept.
+
+        Checkpoints are stored with is_verified=False, which keeps them out of
+        the net worth queries, and TransactionRepository drops the ones a
+        backdated write makes stale.
+        """
+        totals = await self.session.execute(
+            select(
+                Posting.account_id,
+                Posting.currency,
+                func.coalesce(func.sum(Posting.amount), 0),
             )
+            .join(Transaction)
+            .where(Transaction.date < as_of_date)
+            .group_by(Posting.account_id, Posting.currency)
+        )
+        rows = [
+            {
+                "account_id": account_id,
+                "date": as_of_date,
+                "amount": amount,
+                "currency": currency,
+                "is_verified": False,
+            }
+            for account_id, currency, amount in totals
+        ]
+        if not rows:
+            return
+        await self.session.execute(
+            pg_insert(Balance)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=["account_id", "date", "currency"])
         )
-        balance = existing.scalar_one_or_none()
 
-        if balance:
-            balance.amount = amount
-        else:
-            balance = Balance(
-                account_id=account_id,
-                date=date,
-                amount=amount,
-                currency=currency,
-                is_verified=True,
+    async def summarize_by_currency(
+        self, as_of_date: date | None = None
+    ) -> dict[str, tuple[Decimal, Decimal]]:
+        """
+        Total the latest Assets and Liabilities balances per currency.
+
+        Uses the most recent balance on or before as_of_date (default: today)
+        for each account and currency.
+
+        Returns:
+            Dict of currency -> (total_assets, total_liabilities), ordered by
+            currency
+        """
+        if as_of_date is None:
+            as_of_date = date.today()
+
+        latest = (
+            select(Balance.account_id, Balance.currency, Balance.amount)
+            .where(and_(Balance.date <= as_of_date, Balance.is_verified.is_(True)))
+            .distinct(Balance.account_id, Balance.currency)
+            .order_by(Balance.account_id, Balance.currency, Balance.date.desc())
+            .cte("latest_balances")
+        )
+
+        def total(account_type: AccountType):
+            return func.coalesce(
+                func.sum(latest.c.amount).filter(Account.account_type == account_type), 0
             )
-            self.session.add(balance)
 
-        await self.session.flush()
-        return balance
+        result = await self.session.execute(
+            select(
+                latest.c.currency,
+                total(AccountType.ASSETS),
+                total(AccountType.LIABILITIES),
+            )
+            .join(Account, Account.id == latest.c.account_id)
+            .where(Account.account_type.in_([AccountType.ASSETS, AccountType.LIABILITIES]))
+            .group_by(latest.c.currency)
+            .order_by(latest.c.currency)
+        )
+        return {currency: (assets, liabilities) for currency, assets, liabilities in result}
 
     async def get_latest_balances(
         self, as_of_date: date | None = None
     ) -> list[Balance]:
+        result = await self.session.execute(self._latest_balances_query(as_of_date))
+        return list(result.scalars().all())
+
+    async def iter_latest_balances(
+        self, as_of_date: date | None = None
+    ) -> AsyncIterator[Balance]:
+        """Stream latest balances in batches; same rows as get_latest_balances."""
+        result = await self.session.stream_scalars(
+            self._latest_balances_query(as_of_date).execution_options(
+                yield_per=_STREAM_BATCH_SIZE
+            )
+        )
+        async for balance in result:
+            yield balance
+
+    def _latest_balances_query(self, as_of_date: date | None):
         if as_of_date is None:
             as_of_date = date.today()
 
-        subquery = (
-            select(
-                Balance.account_id,
-                Balance.currency,
-                func.max(Balance.date).label("max_date"),
-            )
-            .where(Balance.date <= as_of_date)
-            .group_by(Balance.account_id, Balance.currency)
+        # Index-only pass over ix_balance_latest picking the newest id per
+        # account and currency; full rows are then fetched by primary key
+        latest = (
+            select(Balance.id)
+            .where(and_(Balance.date <= as_of_date, Balance.is_verified.is_(True)))
+            .distinct(Balance.account_id, Balance.currency)
+            .order_by(Balance.account_id, Balance.currency, Balance.date.desc())
             .subquery()
         )
 
-        result = await self.session.execute(
+        return (
             select(Balance)
-            .join(
-                subquery,
-                and_(
-                    Balance.account_id == subquery.c.account_id,
-                    Balance.currency == subquery.c.currency,
-                    Balance.date == subquery.c.max_date,
-                ),
-            )
-            .options(selectinload(Balance.account))
+            .join(latest, Balance.id == latest.c.id)
+            # Many-to-one, so joining the account adds no rows: one query total
+            .options(joinedload(Balance.account))
         )
-        return list(result.scalars().all())
 
-    async def delete(self, balance_id: str) -> bool:
+    async def delete(self, balance_id: UUID) -> bool:
         result = await self.session.execute(
-            select(Balance).where(Balance.id == balance_id)
+            delete(Balance).where(Balance.id == balance_id).returning(Balance.id)
         )
-        balance = result.scalar_one_or_none()
-        if balance:
-            await self.session.delete(balance)
-            await self.session.flush()
-            return True
-        return False
+        return result.scalar_one_or_none() is not None
 
 
 class ExchangeRateRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
+    @property
+    def _rate_cache(self) -> dict[tuple[str, str, date], Decimal | None]:
+        return self.session.info.setdefault(_EXCHANGE_RATE_CACHE, {})
+
+    def _invalidate_pair(self, from_currency: str, to_currency: str) -> None:
+        cache = self._rate_cache
+        for key in [k for k in cache if k[:2] == (from_currency, to_currency)]:
+            del cache[key]
+
     async def create_or_update(
         self,
         date: date,
@@ -659,33 +1241,23 @@ class ExchangeRateRepository:
         rate: Decimal,
         source: str | None = None,
     ) -> ExchangeRate:
-        existing = await self.session.execute(
-            select(ExchangeRate).where(
-                and_(
-                    ExchangeRate.date == date,
-                    ExchangeRate.from_currency == from_currency,
-                    ExchangeRate.to_currency == to_currency,
-                )
-            )
+        self._invalidate_pair(from_currency, to_currency)
+        # Keep the stored source when none is given
+        update_cols = ["rate", "updated_at"] + (["source"] if source else [])
+        return await _upsert(
+            self.session,
+            ExchangeRate,
+            {
+                "date": date,
+                "from_currency": from_currency,
+                "to_currency": to_currency,
+                "rate": rate,
+                "source": source,
+                "updated_at": func.now(),
+            },
+            conflict_cols=["date", "from_currency", "to_currency"],
+            update_cols=update_cols,
         )
-        exchange_rate = existing.scalar_one_or_none()
-
-        if exchange_rate:
-            exchange_rate.rate = rate
-            if source:
-                exchange_rate.source = source
-        else:
-            exchange_rate = ExchangeRate(
-                date=date,
-                from_currency=from_currency,
-                to_currency=to_currency,
-                rate=rate,
-                source=source,
-            )
-            self.session.add(exchange_rate)
-
-        await self.session.flush()
-        return exchange_rate
 
     async def get_rate(
         self,
@@ -696,20 +1268,29 @@ class ExchangeRateRepository:
         if as_of_date is None:
             as_of_date = date.today()
 
+        key = (from_currency, to_currency, as_of_date)
+        cache = self._rate_cache
+        if key in cache:
+            return cache[key]
+
+        # Served from ix_exchange_rates_pair_date without touching the table
         result = await self.session.execute(
-            select(ExchangeRate)
-            .where(
-                and_(
-                    ExchangeRate.from_currency == from_currency,
-                    ExchangeRate.to_currency == to_currency,
-                    ExchangeRate.date <= as_of_date,
+            lambda_stmt(
+                lambda: select(ExchangeRate.rate)
+                .where(
+                    and_(
+                        ExchangeRate.from_currency == from_currency,
+                        ExchangeRate.to_currency == to_currency,
+                        ExchangeRate.date <= as_of_date,
+                    )
                 )
+                .order_by(ExchangeRate.date.desc())
+                .limit(1)
             )
-            .order_by(ExchangeRate.date.desc())
-            .limit(1)
         )
-        rate_obj = result.scalar_one_or_none()
-        return rate_obj.rate if rate_obj else None
+        rate = result.scalar_one_or_none()
+        cache[key] = rate
+        return rate
 
     async def list_all(
         self,
@@ -730,13 +1311,14 @@ class ExchangeRateRepository:
         result = await self.session.execute(query)
         return list(result.scalars().all())
 
-    async def delete(self, exchange_rate_id: str) -> bool:
+    async def delete(self, exchange_rate_id: UUID) -> bool:
         result = await self.session.execute(
-            select(ExchangeRate).where(ExchangeRate.id == exchange_rate_id)
+            delete(ExchangeRate)
+            .where(ExchangeRate.id == exchange_rate_id)
+            .returning(ExchangeRate.from_currency, ExchangeRate.to_currency)
         )
-        rate = result.scalar_one_or_none()
-        if rate:
-            await self.session.delete(rate)
-            await self.session.flush()
-            return True
-        return False
+        pair = result.one_or_none()
+        if pair is None:
+            return False
+        self._invalidate_pair(*pair)
+        return True
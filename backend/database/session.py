@@ -5,13 +5,17 @@ Async database session management.
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
-from database.config import get_settings
+from database.config import settings
 from database.models import Base
 
 # Global engine and session factory
@@ -23,13 +27,34 @@ def get_engine():
     """Get or create the async database engine."""
     global _engine
     if _engine is None:
-        settings = get_settings()
+        url = make_url(settings.database_url)
+        connect_args = {}
+        if url.get_driver_name() == "asyncpg":
+            # Skip per-connection JIT warmup; our queries are short OLTP lookups
+            connect_args["server_settings"] = {"jit": "off"}
+
+        if settings.use_pgbouncer:
+            if url.get_driver_name() == "asyncpg":
+                # Prepared statements don't survive transaction-mode pooling
+                connect_args["statement_cache_size"] = 0
+            pool_args = {"poolclass": NullPool}
+        else:
+            pool_args = {
+                "poolclass": AsyncAdaptedQueuePool,
+                "pool_size": settings.pool_size,
+                "max_overflow": settings.max_overflow,
+                "pool_timeout": settings.pool_timeout,
+                "pool_pre_ping": True,
+                "pool_recycle": settings.pool_recycle,
+            }
+
         _engine = create_async_engine(
-            settings.database_url,
+            url,
             echo=False,  # Set to True for SQL debugging
-            pool_size=settings.pool_size,
-            max_overflow=settings.max_overflow,
-            pool_timeout=settings.pool_timeout,
+            connect_args=connect_args,
+            # Room for every hot statement's compiled form (default is 500)
+            query_cache_size=1200,
+            **pool_args,
         )
     return _engine
 
@@ -56,13 +81,18 @@ def AsyncSessionLocal():
 
 async def init_db():
     """
-    Initialize the database by creating all tables.
+    Initialize the database by creating any missing tables.
 
-    This should be called at application startup.
+    This should be called at application startup. It is a no-op unless
+    `auto_create_tables` is set, so workers don't each introspect the schema.
     """
+    if not settings.auto_create_tables:
+        return
     engine = get_engine()
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(
+            lambda sync_conn: Base.metadata.create_all(sync_conn, checkfirst=True)
+        )
 
 
 async def drop_db():
@@ -93,34 +123,69 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
 
 
 @asynccontextmanager
-async def session_context() -> AsyncGenerator[AsyncSession, None]:
+async def session_context_rw() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Context manager for a session wrapped in one transaction.
+
+    Commits when the block exits normally and rolls back on error.
+
+    Usage:
+        async with session_context_rw() as session:
+            session.add(...)
+    """
+    async with AsyncSessionLocal() as session:
+        async with session.begin():
+            yield session
+
+
+@asynccontextmanager
+async def session_context_ro() -> AsyncGenerator[AsyncSession, None]:
     """
-    Context manager for getting a database session.
+    Context manager for a read-only session.
+
+    Nothing is committed; the transaction is simply released on close.
+    Flushing pending changes raises.
 
     Usage:
-        async with session_context() as session:
+        async with session_context_ro() as session:
             result = await session.execute(...)
     """
-    session = AsyncSessionLocal()
-    try:
+    async with AsyncSessionLocal() as session:
+        session.sync_session.info["read_only"] = True
         yield session
-        await session.commit()
-    except Exception:
-        await session.rollback()
-        raise
-    finally:
-        await session.close()
+
+
+# Backwards-compatible name for the read-write context manager
+session_context = session_context_rw
+
+
+@event.listens_for(Session, "before_flush")
+def _reject_read_only_flush(session: Session, flush_context, instances) -> None:
+    if session.info.get("read_only") and (session.new or session.dirty or session.deleted):
+        raise RuntimeError("Attempted to write in a read-only session")
 
 
 def reset_engine():
     """
-    Reset the engine and session factory.
+    Reset the engine and session factory without closing connections.
+
+    Only safe when the engine was never used; otherwise call
+    reset_engine_async() so pooled connections are closed.
+    """
+    global _engine, _async_session_factory
+    _engine = None
+    _async_session_factory = None
+
+
+async def reset_engine_async():
+    """
+    Dispose of the engine's pooled connections, then reset the globals.
 
-    Useful for testing when switching databases.
+    Called at application shutdown; also useful for testing when switching
+    databases.
     """
     global _engine, _async_session_factory
-    if _engine:
-        # Note: In async context, you'd need to await engine.dispose()
-        pass
+    if _engine is not None:
+        await _engine.dispose()
     _engine = None
     _async_session_factory = None
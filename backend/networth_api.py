@@ -1,16 +1,49 @@
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel, Field
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import AliasPath, BaseModel, Field, TypeAdapter, field_serializer
 from sqlalchemy.ext.asyncio import AsyncSession
+from collections import OrderedDict
 from datetime import date as date_type
+import hashlib
+import logging
+import time
 from decimal import Decimal
 from typing import Optional
+from uuid import UUID
 
 from database.session import get_session
 from database.models import AccountType
 from database.repository import AccountRepository, BalanceRepository, ExchangeRateRepository
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/networth", tags=["networth"])
 
+# Enum -> string map, so per-row serialization is a dict hit rather than an
+# enum .value descriptor lookup
+_TYPE_STR = {account_type: account_type.value for account_type in AccountType}
+
+# Net worth only tracks balance-sheet accounts
+_NETWORTH_PREFIXES = frozenset({"Assets", "Liabilities"})
+_NETWORTH_TYPES = frozenset({AccountType.ASSETS, AccountType.LIABILITIES})
+
+# In-process LRU for single-rate lookups. Writes through this router clear
+# it and bump _RATE_EPOCH; the epoch is part of the key, so a lookup that
+# started before a write cannot file its result under the new epoch. Entries
+# are stamped with time.monotonic() and expire after _RATE_MAX_AGE seconds,
+# so writes made by other workers or outside this router show up within
+# that window; clients may cache for as long via Cache-Control
+_RATE_CACHE_SIZE = 1024
+_RATE_MAX_AGE = 60
+_RATE_EPOCH = 0
+_rate_cache: OrderedDict[tuple, tuple[Decimal, float]] = OrderedDict()
+
+
+def _bump_rate_epoch() -> None:
+    global _RATE_EPOCH
+    _RATE_EPOCH += 1
+    _rate_cache.clear()
+
 
 class AccountCreate(BaseModel):
     name: str
@@ -20,9 +53,9 @@ class AccountCreate(BaseModel):
 
 
 class AccountResponse(BaseModel):
-    id: str
+    id: UUID
     name: str
-    account_type: str
+    account_type: AccountType
     currency: str
     description: Optional[str]
     open_date: date_type
@@ -33,25 +66,34 @@ class AccountResponse(BaseModel):
     class Config:
         from_attributes = True
 
+    @field_serializer("account_type")
+    def _account_type_value(self, value: AccountType) -> str:
+        return _TYPE_STR[value]
+
 
 class BalanceCreate(BaseModel):
-    account_id: str
+    account_id: UUID
     amount: Decimal
     currency: str
     date: date_type = Field(default_factory=date_type.today)
 
 
 class BalanceResponse(BaseModel):
-    id: str
-    account_id: str
-    account_name: str
-    account_type: str
+    id: UUID
+    account_id: UUID
+    account_name: str = Field(validation_alias=AliasPath("account", "name"))
+    account_type: AccountType = Field(validation_alias=AliasPath("account", "account_type"))
     amount: Decimal
     currency: str
     date: date_type
 
     class Config:
         from_attributes = True
+        populate_by_name = True
+
+    @field_serializer("account_type")
+    def _account_type_value(self, value: AccountType) -> str:
+        return _TYPE_STR[value]
 
 
 class NetWorthSummary(BaseModel):
@@ -76,7 +118,7 @@ class ExchangeRateCreate(BaseModel):
 
 
 class ExchangeRateResponse(BaseModel):
-    id: str
+    id: UUID
     from_currency: str
     to_currency: str
     rate: Decimal
@@ -87,41 +129,37 @@ class ExchangeRateResponse(BaseModel):
         from_attributes = True
 
 
+# List endpoints validate and dump whole result sets in one pass through
+# pydantic-core. The bytes are returned as a Response, so FastAPI does not
+# validate them again; response_model is kept for the OpenAPI schema
+_ACCOUNTS_ADAPTER = TypeAdapter(list[AccountResponse])
+_RATES_ADAPTER = TypeAdapter(list[ExchangeRateResponse])
+_SUMMARIES_ADAPTER = TypeAdapter(list[NetWorthSummary])
+_BALANCE_ADAPTER = TypeAdapter(BalanceResponse)
+
+
+def _json_response(adapter: TypeAdapter, rows) -> Response:
+    return Response(
+        content=adapter.dump_json(adapter.validate_python(rows)),
+        media_type="application/json",
+    )
+
+
 @router.get("/accounts", response_model=list[AccountResponse])
 async def list_networth_accounts(
     session: AsyncSession = Depends(get_session),
 ):
     account_repo = AccountRepository(session)
-    balance_repo = BalanceRepository(session)
+
+    rows = await account_repo.list_networth_with_balances()
 
     accounts = []
-    for account_type in [AccountType.ASSETS, AccountType.LIABILITIES]:
-        accounts.extend(
-            await account_repo.list_all(account_type=account_type, is_active=True)
-        )
+    for account, current_balance in rows:
+        # Transient attribute read by AccountResponse; not a mapped column
+        account.current_balance = current_balance
+        accounts.append(account)
 
-    balances = await balance_repo.get_latest_balances()
-    balance_map = {
-        (entry.account_id, entry.currency): entry.amount
-        for entry in balances
-    }
-
-    response = []
-    for account in accounts:
-        account_dict = {
-            "id": account.id,
-            "name": account.name,
-            "account_type": account.account_type.value,
-            "currency": account.currency,
-            "description": account.description,
-            "open_date": account.open_date,
-            "close_date": account.close_date,
-            "is_active": account.is_active,
-            "current_balance": balance_map.get((account.id, account.currency)),
-        }
-        response.append(AccountResponse(**account_dict))
-
-    return response
+    return _json_response(_ACCOUNTS_ADAPTER, accounts)
 
 
 @router.post("/accounts", response_model=AccountResponse)
@@ -131,8 +169,8 @@ async def create_networth_account(
 ):
     account_repo = AccountRepository(session)
 
-    first_component = account_data.name.split(":")[0]
-    if first_component not in ["Assets", "Liabilities"]:
+    first_component = account_data.name.partition(":")[0]
+    if first_component not in _NETWORTH_PREFIXES:
         raise HTTPException(
             status_code=400,
             detail="Account name must start with 'Assets:' or 'Liabilities:'"
@@ -147,17 +185,7 @@ async def create_networth_account(
         )
         await session.commit()
 
-        return AccountResponse(
-            id=account.id,
-            name=account.name,
-            account_type=account.account_type.value,
-            currency=account.currency,
-            description=account.description,
-            open_date=account.open_date,
-            close_date=account.close_date,
-            is_active=account.is_active,
-            current_balance=None,
-        )
+        return AccountResponse.model_validate(account)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -170,11 +198,12 @@ async def create_balance(
     account_repo = AccountRepository(session)
     balance_repo = BalanceRepository(session)
 
-    account = await account_repo.get_by_id(balance_data.account_id)
-    if not account:
+    account = await account_repo.get_type_and_name(balance_data.account_id)
+    if account is None:
         raise HTTPException(status_code=404, detail="Account not found")
 
-    if account.account_type not in [AccountType.ASSETS, AccountType.LIABILITIES]:
+    account_type, account_name = account
+    if account_type not in _NETWORTH_TYPES:
         raise HTTPException(
             status_code=400,
             detail="Can only set balances for Assets or Liabilities accounts"
@@ -190,9 +219,9 @@ async def create_balance(
 
     return BalanceResponse(
         id=balance.id,
-        account_id=account.id,
-        account_name=account.name,
-        account_type=account.account_type.value,
+        account_id=balance.account_id,
+        account_name=account_name,
+        account_type=account_type,
         amount=balance.amount,
         currency=balance.currency,
         date=balance.date,
@@ -209,59 +238,52 @@ async def get_networth_summary(
 
     balance_repo = BalanceRepository(session)
 
-    balances = await balance_repo.get_latest_balances(as_of_date=as_of_date)
-
-    balance_responses = []
-    for balance in balances:
-        balance_responses.append(
-            BalanceResponse(
-                id=balance.id,
-                account_id=balance.account.id,
-                account_name=balance.account.name,
-                account_type=balance.account.account_type.value,
-                amount=balance.amount,
-                currency=balance.currency,
-                date=balance.date,
-            )
+    # Both queries run on the request's single AsyncSession (one connection),
+    # so they execute one after the other; asyncio.gather would not overlap
+    # them and an AsyncSession must not be used concurrently anyway.
+    # Totals come first so the entries can be streamed after them
+    totals = await balance_repo.summarize_by_currency(as_of_date=as_of_date)
+    summaries = [
+        NetWorthSummary(
+            currency=currency,
+            total_assets=total_assets,
+            total_liabilities=total_liabilities,
+            net_worth=total_assets - total_liabilities,
         )
+        for currency, (total_assets, total_liabilities) in totals.items()
+    ]
 
-    summary_by_currency = {}
-    for balance in balances:
-        currency = balance.currency
-        if currency not in summary_by_currency:
-            summary_by_currency[currency] = {
-                "total_assets": Decimal(0),
-                "total_liabilities": Decimal(0),
-            }
-
-        if balance.account.account_type == AccountType.ASSETS:
-            summary_by_currency[currency]["total_assets"] += balance.amount
-        elif balance.account.account_type == AccountType.LIABILITIES:
-            summary_by_currency[currency]["total_liabilities"] += balance.amount
-
-    summaries = []
-    for currency, totals in summary_by_currency.items():
-        summaries.append(
-            NetWorthSummary(
-                currency=currency,
-                total_assets=totals["total_assets"],
-                total_liabilities=totals["total_liabilities"],
-                net_worth=totals["total_assets"] - totals["total_liabilities"],
-            )
+    # Same JSON as NetWorthResponse, written entry by entry so memory stays
+    # flat however many balances there are. The session dependency is only
+    # closed once the response has been sent (FastAPI >= 0.118). The first
+    # batch is fetched up front so a failing query still becomes a 500
+    balances = balance_repo.iter_latest_balances(as_of_date=as_of_date)
+    first = await anext(balances, None)
+
+    async def body():
+        yield b'{"as_of_date":"%s","by_currency":%s,"entries":[' % (
+            as_of_date.isoformat().encode(),
+            _SUMMARIES_ADAPTER.dump_json(summaries),
         )
-
-    summaries.sort(key=lambda x: x.currency)
-
-    return NetWorthResponse(
-        as_of_date=as_of_date,
-        by_currency=summaries,
-        entries=balance_responses,
-    )
+        if first is not None:
+            yield _BALANCE_ADAPTER.dump_json(_BALANCE_ADAPTER.validate_python(first))
+            try:
+                async for balance in balances:
+                    yield b"," + _BALANCE_ADAPTER.dump_json(
+                        _BALANCE_ADAPTER.validate_python(balance)
+                    )
+            except Exception:
+                # Headers are already sent; the client sees truncated JSON
+                logger.exception("Net worth summary stream failed")
+                raise
+        yield b"]}"
+
+    return StreamingResponse(body(), media_type="application/json")
 
 
 @router.delete("/balances/{balance_id}")
 async def delete_balance(
-    balance_id: str,
+    balance_id: UUID,
     session: AsyncSession = Depends(get_session),
 ):
     balance_repo = BalanceRepository(session)
@@ -289,15 +311,9 @@ async def create_exchange_rate(
         source=rate_data.source,
     )
     await session.commit()
+    _bump_rate_epoch()
 
-    return ExchangeRateResponse(
-        id=rate.id,
-        from_currency=rate.from_currency,
-        to_currency=rate.to_currency,
-        rate=rate.rate,
-        date=rate.date,
-        source=rate.source,
-    )
+    return ExchangeRateResponse.model_validate(rate)
 
 
 @router.get("/exchange-rates", response_model=list[ExchangeRateResponse])
@@ -313,46 +329,62 @@ async def list_exchange_rates(
         to_currency=to_currency,
     )
 
-    return [
-        ExchangeRateResponse(
-            id=rate.id,
-            from_currency=rate.from_currency,
-            to_currency=rate.to_currency,
-            rate=rate.rate,
-            date=rate.date,
-            source=rate.source,
-        )
-        for rate in rates
-    ]
+    return _json_response(_RATES_ADAPTER, rates)
 
 
 @router.get("/exchange-rates/{from_currency}/{to_currency}")
 async def get_exchange_rate(
     from_currency: str,
     to_currency: str,
+    request: Request,
+    response: Response,
     as_of_date: Optional[date_type] = None,
     session: AsyncSession = Depends(get_session),
 ):
-    rate_repo = ExchangeRateRepository(session)
-
-    rate = await rate_repo.get_rate(
-        from_currency=from_currency,
-        to_currency=to_currency,
-        as_of_date=as_of_date,
-    )
+    # Resolve "today" here so cached entries do not outlive the day
+    if as_of_date is None:
+        as_of_date = date_type.today()
 
-    if rate is None:
-        raise HTTPException(
-            status_code=404,
-            detail=f"No exchange rate found for {from_currency}/{to_currency}"
+    key = (from_currency, to_currency, as_of_date, _RATE_EPOCH)
+    now = time.monotonic()
+    cached = _rate_cache.get(key)
+    if cached is not None and now - cached[1] < _RATE_MAX_AGE:
+        rate = cached[0]
+        _rate_cache.move_to_end(key)
+    else:
+        rate_repo = ExchangeRateRepository(session)
+        rate = await rate_repo.get_rate(
+            from_currency=from_currency,
+            to_currency=to_currency,
+            as_of_date=as_of_date,
         )
 
+        if rate is None:
+            _rate_cache.pop(key, None)
+            raise HTTPException(
+                status_code=404,
+                detail=f"No exchange rate found for {from_currency}/{to_currency}"
+            )
+
+        _rate_cache[key] = (rate, now)
+        _rate_cache.move_to_end(key)
+        if len(_rate_cache) > _RATE_CACHE_SIZE:
+            _rate_cache.popitem(last=False)
+
+    # Derived from the payload rather than the epoch, which restarts at zero
+    digest = hashlib.sha1(f"{from_currency}/{to_currency}/{as_of_date}/{rate}".encode())
+    etag = f'"{digest.hexdigest()[:16]}"'
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={_RATE_MAX_AGE}"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
     return {"from_currency": from_currency, "to_currency": to_currency, "rate": rate}
 
 
 @router.delete("/exchange-rates/{rate_id}")
 async def delete_exchange_rate(
-    rate_id: str,
+    rate_id: UUID,
     session: AsyncSession = Depends(get_session),
 ):
     rate_repo = ExchangeRateRepository(session)
@@ -362,4 +394,5 @@ async def delete_exchange_rate(
         raise HTTPException(status_code=404, detail="Exchange rate not found")
 
     await session.commit()
+    _bump_rate_epoch()
     return {"message": "Exchange rate deleted successfully"}
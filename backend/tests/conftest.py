@@ -2,18 +2,14 @@
 Pytest fixtures for database testing with PostgreSQL.
 """
 
-import asyncio
 from datetime import date
 from typing import AsyncGenerator
 
 import pytest
 import pytest_asyncio
 from sqlalchemy import text
-from sqlalchemy.ext.asyncio import (
-    AsyncSession,
-    create_async_engine,
-    async_sessionmaker,
-)
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
 
 from database.config import get_settings
 from database.models import Base, Account
@@ -23,40 +19,37 @@ from database.repository import AccountRepository, TransactionRepository
 settings = get_settings()
 TEST_DB_NAME = f"{settings.postgres_db}_test"
 TEST_DATABASE_URL = (
-    f"postgresql+psycopg://{settings.postgres_user}:{settings.postgres_password}"
+    f"postgresql+{settings.db_driver}://{settings.postgres_user}:{settings.postgres_password}"
     f"@{settings.postgres_host}:{settings.postgres_port}/{TEST_DB_NAME}"
 )
 ADMIN_DATABASE_URL = (
-    f"postgresql+psycopg://{settings.postgres_user}:{settings.postgres_password}"
+    f"postgresql+{settings.db_driver}://{settings.postgres_user}:{settings.postgres_password}"
     f"@{settings.postgres_host}:{settings.postgres_port}/postgres"
 )
 
 
-@pytest.fixture(scope="session")
-def event_loop():
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
-
-
 @pytest_asyncio.fixture(scope="session")
 async def setup_test_database():
     """Create test database at session start, drop at session end."""
-    admin_engine = create_async_engine(ADMIN_DATABASE_URL, isolation_level="AUTOCOMMIT")
+    # One engine for setup and teardown; NullPool holds no connection between them
+    admin_engine = create_async_engine(
+        ADMIN_DATABASE_URL, isolation_level="AUTOCOMMIT", poolclass=NullPool
+    )
 
     async with admin_engine.connect() as conn:
         # Drop test database if exists
         await conn.execute(text(f"DROP DATABASE IF EXISTS {TEST_DB_NAME}"))
         # Create fresh test database
         await conn.execute(text(f"CREATE DATABASE {TEST_DB_NAME}"))
-
-    await admin_engine.dispose()
+        # Throwaway data: don't wait for WAL flushes on commit (the Postgres
+        # counterpart of SQLite's PRAGMA synchronous=OFF)
+        await conn.execute(
+            text(f"ALTER DATABASE {TEST_DB_NAME} SET synchronous_commit = off")
+        )
 
     yield
 
     # Teardown: drop test database
-    admin_engine = create_async_engine(ADMIN_DATABASE_URL, isolation_level="AUTOCOMMIT")
-
     async with admin_engine.connect() as conn:
         # Terminate existing connections
         await conn.execute(text(f"""
@@ -70,21 +63,24 @@ async def setup_test_database():
     await admin_engine.dispose()
 
 
-@pytest_asyncio.fixture(scope="function")
+@pytest_asyncio.fixture(scope="session")
 async def engine(setup_test_database):
-    """Create a test database engine."""
+    """Create the test engine and schema once for the whole session."""
     engine = create_async_engine(
         TEST_DATABASE_URL,
         echo=False,
+        # AsyncAdaptedQueuePool is picked automatically for async engines
+        pool_size=20,
+        max_overflow=10,
+        pool_pre_ping=True,
+        pool_recycle=1800,
     )
 
-    # Create all tables
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
     yield engine
 
-    # Drop all tables after test
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
 
@@ -93,16 +89,23 @@ async def engine(setup_test_database):
 
 @pytest_asyncio.fixture(scope="function")
 async def session(engine) -> AsyncGenerator[AsyncSession, None]:
-    """Create a test database session."""
-    async_session_factory = async_sessionmaker(
-        engine,
-        class_=AsyncSession,
-        expire_on_commit=False,
-    )
-
-    async with async_session_factory() as session:
+    """
+    Create a test database session isolated in a rolled-back transaction.
+
+    The session joins an outer transaction through SAVEPOINTs, so commit()
+    and rollback() inside a test only release or roll back a savepoint, and
+    everything is discarded at teardown.
+    """
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        session = AsyncSession(
+            bind=conn,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+        )
         yield session
-        await session.rollback()
+        await session.close()
+        await transaction.rollback()
 
 
 @pytest_asyncio.fixture
@@ -130,14 +133,17 @@ async def sample_accounts(account_repo: AccountRepository) -> dict[str, Account]
         ("Equity:OpeningBalance", "USD", "Opening balances"),
     ]
 
-    for name, currency, description in account_data:
-        account = await account_repo.create(
-            name=name,
-            open_date=date(2024, 1, 1),
-            currency=currency,
-            description=description,
-        )
-        key = name.split(":")[-1]
+    created = await account_repo.create_many([
+        {
+            "name": name,
+            "open_date": date(2024, 1, 1),
+            "currency": currency,
+            "description": description,
+        }
+        for name, currency, description in account_data
+    ])
+    for account in created:
+        key = account.name.split(":")[-1]
         accounts[key] = account
 
     return accounts
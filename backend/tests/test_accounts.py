@@ -1,10 +1,11 @@
 import uuid
 from datetime import date
+from decimal import Decimal
 
 import pytest
 
 from database.models import AccountType
-from database.repository import AccountRepository
+from database.repository import AccountRepository, TransactionRepository
 
 
 @pytest.mark.asyncio
@@ -70,6 +71,18 @@ class TestAccountCreation:
 
         assert "Invalid account type" in str(exc_info.value)
 
+    async def test_create_many(self, account_repo: AccountRepository):
+        accounts = await account_repo.create_many([
+            {"name": "Assets:Cash", "open_date": date(2024, 1, 1)},
+            {"name": "Expenses:Rent", "open_date": date(2024, 1, 1), "currency": "EUR"},
+        ])
+
+        assert [a.name for a in accounts] == ["Assets:Cash", "Expenses:Rent"]
+        assert all(a.id is not None for a in accounts)
+        assert accounts[0].account_type == AccountType.ASSETS
+        assert accounts[1].currency == "EUR"
+        assert await account_repo.get_by_name("Expenses:Rent") is accounts[1]
+
 
 @pytest.mark.asyncio
 class TestAccountRetrieval:
@@ -99,6 +112,16 @@ class TestAccountRetrieval:
         account = await account_repo.get_by_name("Nonexistent:Account")
         assert account is None
 
+    async def test_get_type_and_name(
+        self, account_repo: AccountRepository, sample_accounts: dict
+    ):
+        visa = sample_accounts["Visa"]
+
+        assert await account_repo.get_type_and_name(visa.id) == (
+            AccountType.LIABILITIES, "Liabilities:CreditCard:Visa"
+        )
+        assert await account_repo.get_type_and_name(uuid.uuid4()) is None
+
     async def test_get_or_create_existing(
         self, account_repo: AccountRepository, sample_accounts: dict
     ):
@@ -119,6 +142,26 @@ class TestAccountRetrieval:
         assert created is True
         assert account.name == "Assets:Cash:Wallet"
 
+    async def test_get_or_create_rolled_back_savepoint(self, account_repo: AccountRepository):
+        savepoint = await account_repo.session.begin_nested()
+        await account_repo.get_or_create(name="Assets:Cash:Wallet", open_date=date(2024, 1, 1))
+        await savepoint.rollback()
+
+        # The cached account went away with the savepoint
+        assert await account_repo.get_by_name("Assets:Cash:Wallet") is None
+
+    async def test_get_by_name_shared_across_repositories(
+        self, account_repo: AccountRepository, sample_accounts: dict
+    ):
+        other_repo = AccountRepository(account_repo.session)
+
+        first = await account_repo.get_by_name("Assets:Bank:Checking")
+        second = await other_repo.get_by_name("Assets:Bank:Checking")
+        assert second is first
+
+        await other_repo.delete(first.id)
+        assert await account_repo.get_by_name("Assets:Bank:Checking") is None
+
 
 @pytest.mark.asyncio
 class TestAccountListing:
@@ -148,6 +191,19 @@ class TestAccountListing:
         for account in food_accounts:
             assert account.name.startswith("Expenses:Food")
 
+    async def test_iter_matches_list(
+        self, account_repo: AccountRepository, sample_accounts: dict
+    ):
+        listed = await account_repo.list_all(account_type=AccountType.EXPENSES)
+        streamed = [
+            account
+            async for account in account_repo.iter_all(account_type=AccountType.EXPENSES)
+        ]
+        assert streamed == listed
+
+        by_prefix = [account async for account in account_repo.iter_by_prefix("Expenses:Food")]
+        assert by_prefix == await account_repo.list_by_prefix("Expenses:Food")
+
     async def test_list_active_only(
         self, account_repo: AccountRepository, sample_accounts: dict
     ):
@@ -187,6 +243,30 @@ class TestAccountOperations:
         retrieved = await account_repo.get_by_id(checking.id)
         assert retrieved is None
 
+    async def test_delete_account_with_postings(
+        self,
+        account_repo: AccountRepository,
+        transaction_repo: TransactionRepository,
+        sample_accounts: dict,
+    ):
+        transaction = await transaction_repo.create(
+            date=date(2024, 3, 15),
+            narration="Groceries",
+            postings=[
+                {"account_id": sample_accounts["Groceries"].id, "amount": Decimal("10.00")},
+                {"account_id": sample_accounts["Checking"].id, "amount": Decimal("-10.00")},
+            ],
+        )
+
+        deleted = await account_repo.delete(sample_accounts["Groceries"].id)
+        assert deleted is True
+
+        balance = await account_repo.get_balance(
+            sample_accounts["Groceries"].id, as_of_date=date(2024, 3, 31)
+        )
+        assert balance == Decimal(0)
+        assert await transaction_repo.is_balanced(transaction.id) is False
+
     async def test_delete_nonexistent_account(self, account_repo: AccountRepository):
         deleted = await account_repo.delete(str(uuid.uuid4()))
         assert deleted is False
@@ -29,7 +29,7 @@ async def test_create_balance_entry(
         open_date=date(2024, 1, 1),
         currency="USD",
     )
-    await session.commit()
+    await session.flush()
 
     balance = await balance_repo.create_or_update(
         account_id=account.id,
@@ -37,7 +37,7 @@ async def test_create_balance_entry(
         amount=Decimal("10000.50"),
         currency="USD",
     )
-    await session.commit()
+    await session.flush()
 
     assert balance.id is not None
     assert balance.account_id == account.id
@@ -58,7 +58,7 @@ async def test_update_existing_balance(
         open_date=date(2024, 1, 1),
         currency="USD",
     )
-    await session.commit()
+    await session.flush()
 
     balance1 = await balance_repo.create_or_update(
         account_id=account.id,
@@ -66,7 +66,7 @@ async def test_update_existing_balance(
         amount=Decimal("5000"),
         currency="USD",
     )
-    await session.commit()
+    await session.flush()
     balance1_id = balance1.id
 
     balance2 = await balance_repo.create_or_update(
@@ -75,7 +75,7 @@ async def test_update_existing_balance(
         amount=Decimal("7500"),
         currency="USD",
     )
-    await session.commit()
+    await session.flush()
 
     assert balance2.id == balance1_id
     assert balance2.amount == Decimal("7500")
@@ -92,7 +92,7 @@ async def test_get_latest_balances(
         open_date=date(2024, 1, 1),
         currency="USD",
     )
-    await session.commit()
+    await session.flush()
 
     await balance_repo.create_or_update(
         account_id=account.id,
@@ -112,7 +112,7 @@ async def test_get_latest_balances(
         amount=Decimal("3000"),
         currency="USD",
     )
-    await session.commit()
+    await session.flush()
 
     balances = await balance_repo.get_latest_balances(as_of_date=date(2024, 12, 31))
     assert len(balances) == 1
@@ -122,6 +122,80 @@ async def test_get_latest_balances(
     assert len(balances_june) == 1
     assert balances_june[0].amount == Decimal("2000")
 
+    streamed = [b async for b in balance_repo.iter_latest_balances(as_of_date=date(2024, 6, 30))]
+    assert [b.id for b in streamed] == [b.id for b in balances_june]
+    assert streamed[0].account.name == "Assets:Bank:LatestTest"
+
+
+@pytest.mark.asyncio
+async def test_list_networth_with_balances(
+    account_repo: AccountRepository,
+    balance_repo: BalanceRepository,
+    session: AsyncSession,
+):
+    card = await account_repo.create(
+        name="Liabilities:CreditCard:NetWorth",
+        open_date=date(2024, 1, 1),
+        currency="USD",
+    )
+    savings = await account_repo.create(
+        name="Assets:Bank:NetWorth",
+        open_date=date(2024, 1, 1),
+        currency="EUR",
+    )
+    await account_repo.create(
+        name="Expenses:Food:NetWorth",
+        open_date=date(2024, 1, 1),
+    )
+    await balance_repo.create_or_update(
+        account_id=savings.id, date=date(2024, 1, 1), amount=Decimal("100"), currency="EUR"
+    )
+    await balance_repo.create_or_update(
+        account_id=savings.id, date=date(2024, 6, 1), amount=Decimal("250"), currency="EUR"
+    )
+    # Balances in another currency don't count as the account's balance
+    await balance_repo.create_or_update(
+        account_id=savings.id, date=date(2024, 7, 1), amount=Decimal("999"), currency="USD"
+    )
+    await session.flush()
+
+    rows = await account_repo.list_networth_with_balances(as_of_date=date(2024, 6, 30))
+
+    assert [(account.id, amount) for account, amount in rows] == [
+        (savings.id, Decimal("250")),
+        (card.id, None),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_summarize_by_currency(
+    account_repo: AccountRepository,
+    balance_repo: BalanceRepository,
+    session: AsyncSession,
+):
+    checking = await account_repo.create(
+        name="Assets:Bank:SummaryChecking", open_date=date(2024, 1, 1)
+    )
+    card = await account_repo.create(
+        name="Liabilities:CreditCard:Summary", open_date=date(2024, 1, 1)
+    )
+    for account_id, day, amount, currency in [
+        (checking.id, date(2024, 1, 1), "500", "USD"),
+        (checking.id, date(2024, 6, 1), "800", "USD"),
+        (checking.id, date(2024, 6, 1), "300", "EUR"),
+        (card.id, date(2024, 5, 1), "200", "USD"),
+    ]:
+        await balance_repo.create_or_update(
+            account_id=account_id, date=day, amount=Decimal(amount), currency=currency
+        )
+    await session.flush()
+
+    summary = await balance_repo.summarize_by_currency(as_of_date=date(2024, 6, 30))
+
+    assert list(summary) == ["EUR", "USD"]
+    assert summary["EUR"] == (Decimal("300"), Decimal("0"))
+    assert summary["USD"] == (Decimal("800"), Decimal("200"))
+
 
 @pytest.mark.asyncio
 async def test_multi_currency_balances(
@@ -134,7 +208,7 @@ async def test_multi_currency_balances(
         open_date=date(2024, 1, 1),
         currency="USD",
     )
-    await session.commit()
+    await session.flush()
 
     await balance_repo.create_or_update(
         account_id=account.id,
@@ -148,7 +222,7 @@ async def test_multi_currency_balances(
         amount=Decimal("500000"),
         currency="INR",
     )
-    await session.commit()
+    await session.flush()
 
     balances = await balance_repo.get_latest_balances()
     assert len(balances) == 2
@@ -168,7 +242,7 @@ async def test_delete_balance(
         open_date=date(2024, 1, 1),
         currency="USD",
     )
-    await session.commit()
+    await session.flush()
 
     balance = await balance_repo.create_or_update(
         account_id=account.id,
@@ -176,11 +250,11 @@ async def test_delete_balance(
         amount=Decimal("1000"),
         currency="USD",
     )
-    await session.commit()
+    await session.flush()
     balance_id = balance.id
 
     deleted = await balance_repo.delete(balance_id)
-    await session.commit()
+    await session.flush()
 
     assert deleted is True
 
@@ -200,7 +274,7 @@ async def test_create_exchange_rate(
         rate=Decimal("83.5"),
         source="manual",
     )
-    await session.commit()
+    await session.flush()
 
     assert rate.id is not None
     assert rate.from_currency == "USD"
@@ -220,7 +294,7 @@ async def test_update_exchange_rate(
         to_currency="EUR",
         rate=Decimal("0.92"),
     )
-    await session.commit()
+    await session.flush()
     rate1_id = rate1.id
 
     rate2 = await exchange_rate_repo.create_or_update(
@@ -229,7 +303,7 @@ async def test_update_exchange_rate(
         to_currency="EUR",
         rate=Decimal("0.93"),
     )
-    await session.commit()
+    await session.flush()
 
     assert rate2.id == rate1_id
     assert rate2.rate == Decimal("0.93")
@@ -258,7 +332,7 @@ async def test_get_exchange_rate(
         to_currency="GBP",
         rate=Decimal("0.81"),
     )
-    await session.commit()
+    await session.flush()
 
     rate_june = await exchange_rate_repo.get_rate(
         from_currency="USD",
@@ -275,6 +349,28 @@ async def test_get_exchange_rate(
     assert rate_latest == Decimal("0.81")
 
 
+@pytest.mark.asyncio
+async def test_get_exchange_rate_sees_updates(
+    exchange_rate_repo: ExchangeRateRepository,
+    session: AsyncSession,
+):
+    rate = await exchange_rate_repo.get_rate("USD", "JPY", as_of_date=date(2024, 6, 30))
+    assert rate is None
+
+    created = await exchange_rate_repo.create_or_update(
+        date=date(2024, 6, 1),
+        from_currency="USD",
+        to_currency="JPY",
+        rate=Decimal("157.5"),
+    )
+    rate = await exchange_rate_repo.get_rate("USD", "JPY", as_of_date=date(2024, 6, 30))
+    assert rate == Decimal("157.5")
+
+    await exchange_rate_repo.delete(created.id)
+    rate = await exchange_rate_repo.get_rate("USD", "JPY", as_of_date=date(2024, 6, 30))
+    assert rate is None
+
+
 @pytest.mark.asyncio
 async def test_list_exchange_rates(
     exchange_rate_repo: ExchangeRateRepository,
@@ -298,7 +394,7 @@ async def test_list_exchange_rates(
         to_currency="INR",
         rate=Decimal("90.5"),
     )
-    await session.commit()
+    await session.flush()
 
     all_rates = await exchange_rate_repo.list_all()
     assert len(all_rates) == 3
@@ -321,13 +417,33 @@ async def test_delete_exchange_rate(
         to_currency="CAD",
         rate=Decimal("1.35"),
     )
-    await session.commit()
+    await session.flush()
     rate_id = rate.id
 
     deleted = await exchange_rate_repo.delete(rate_id)
-    await session.commit()
+    await session.flush()
 
     assert deleted is True
 
     all_rates = await exchange_rate_repo.list_all()
     assert len(all_rates) == 0
+
+
+@pytest.mark.asyncio
+async def test_get_exchange_rate_after_savepoint_rollback(
+    exchange_rate_repo: ExchangeRateRepository,
+    session: AsyncSession,
+):
+    savepoint = await session.begin_nested()
+    await exchange_rate_repo.create_or_update(
+        date=date(2024, 6, 1),
+        from_currency="USD",
+        to_currency="CHF",
+        rate=Decimal("0.89"),
+    )
+    rate = await exchange_rate_repo.get_rate("USD", "CHF", as_of_date=date(2024, 6, 30))
+    assert rate == Decimal("0.89")
+    await savepoint.rollback()
+
+    rate = await exchange_rate_repo.get_rate("USD", "CHF", as_of_date=date(2024, 6, 30))
+    assert rate is None
@@ -4,9 +4,10 @@ from decimal import Decimal
 
 import pytest
 import pytest_asyncio
+from sqlalchemy import func, select
 
-from database.models import Transaction
-from database.repository import AccountRepository, TransactionRepository
+from database.models import Balance, Transaction
+from database.repository import AccountRepository, BalanceRepository, TransactionRepository
 
 
 @pytest.mark.asyncio
@@ -184,6 +185,31 @@ class TestTransactionRetrieval:
         transaction = await transaction_repo.get_by_id(str(uuid.uuid4()))
         assert transaction is None
 
+    async def test_get_by_ids(
+        self,
+        transaction_repo: TransactionRepository,
+        sample_accounts: dict,
+    ):
+        created = [
+            await transaction_repo.create(
+                date=date(2024, 3, day),
+                narration=f"Batch {day}",
+                postings=[
+                    {"account_id": sample_accounts["Groceries"].id, "amount": Decimal("10.00")},
+                    {"account_id": sample_accounts["Checking"].id, "amount": Decimal("-10.00")},
+                ],
+            )
+            for day in (1, 2)
+        ]
+        missing = uuid.uuid4()
+
+        retrieved = await transaction_repo.get_by_ids([t.id for t in created] + [missing])
+
+        assert set(retrieved) == {t.id for t in created}
+        assert retrieved[created[1].id].narration == "Batch 2"
+        assert len(retrieved[created[0].id].postings) == 2
+        assert await transaction_repo.get_by_ids([]) == {}
+
 
 @pytest.mark.asyncio
 class TestTransactionListing:
@@ -251,6 +277,60 @@ class TestTransactionListing:
 
         assert len(transactions) == 2
 
+    async def test_list_by_date_range_paginated(
+        self,
+        transaction_repo: TransactionRepository,
+        sample_transactions: list[Transaction],
+    ):
+        first_page = await transaction_repo.list_by_date_range(
+            start_date=date(2024, 3, 1),
+            end_date=date(2024, 3, 31),
+            limit=3,
+        )
+        last = first_page[-1]
+        second_page = await transaction_repo.list_by_date_range(
+            start_date=date(2024, 3, 1),
+            end_date=date(2024, 3, 31),
+            after=(last.date, last.id),
+            limit=3,
+        )
+
+        assert [t.narration for t in first_page + second_page] == [
+            "Grocery 1", "Restaurant 1", "Grocery 2", "Gas", "Restaurant 2",
+        ]
+
+    async def test_iter_by_date_range(
+        self,
+        transaction_repo: TransactionRepository,
+        sample_transactions: list[Transaction],
+        sample_accounts: dict,
+    ):
+        streamed = [
+            txn
+            async for txn in transaction_repo.iter_by_date_range(
+                start_date=date(2024, 3, 1),
+                end_date=date(2024, 3, 31),
+                account_id=sample_accounts["Checking"].id,
+            )
+        ]
+
+        assert [t.narration for t in streamed] == [
+            "Grocery 1", "Restaurant 1", "Grocery 2", "Gas", "Restaurant 2",
+        ]
+        assert all(len(t.postings) == 2 for t in streamed)
+
+    async def test_search_paginated(
+        self,
+        transaction_repo: TransactionRepository,
+        sample_transactions: list[Transaction],
+    ):
+        first_page = await transaction_repo.search(limit=2)
+        last = first_page[-1]
+        second_page = await transaction_repo.search(after=(last.date, last.id), limit=2)
+
+        assert [t.narration for t in first_page] == ["Restaurant 2", "Gas"]
+        assert [t.narration for t in second_page] == ["Grocery 2", "Restaurant 1"]
+
     async def test_search_by_narration(
         self,
         transaction_repo: TransactionRepository,
@@ -359,6 +439,47 @@ class TestTransactionOperations:
         retrieved = await transaction_repo.get_by_id(transaction.id)
         assert retrieved is None
 
+    async def test_check_balanced(
+        self,
+        transaction_repo: TransactionRepository,
+        sample_accounts: dict,
+    ):
+        transaction = await transaction_repo.create(
+            date=date(2024, 3, 15),
+            narration="Balanced",
+            postings=[
+                {"account_id": sample_accounts["Groceries"].id, "amount": Decimal("20.00")},
+                {"account_id": sample_accounts["Checking"].id, "amount": Decimal("-20.00")},
+            ],
+        )
+
+        assert await transaction_repo.is_balanced(transaction.id) is True
+        balanced = await transaction_repo.check_balanced([transaction.id])
+        assert balanced == {transaction.id: True}
+        assert await transaction_repo.check_balanced([]) == {}
+
+    async def test_add_tags_and_links_skips_existing(
+        self,
+        transaction_repo: TransactionRepository,
+        sample_accounts: dict,
+    ):
+        transaction = await transaction_repo.create(
+            date=date(2024, 3, 15),
+            narration="Tagged",
+            tags=["business"],
+            links=["trip-2024-nyc"],
+            postings=[
+                {"account_id": sample_accounts["Groceries"].id, "amount": Decimal("20.00")},
+                {"account_id": sample_accounts["Checking"].id, "amount": Decimal("-20.00")},
+            ],
+        )
+
+        await transaction_repo.add_tags(transaction.id, ["business", "travel"])
+        await transaction_repo.add_links(transaction.id, ["trip-2024-nyc"])
+
+        assert len(await transaction_repo.search(tag="travel")) == 1
+        assert len(await transaction_repo.get_by_link("trip-2024-nyc")) == 1
+
 
 @pytest.mark.asyncio
 class TestAccountBalance:
@@ -429,6 +550,134 @@ class TestAccountBalance:
         )
         assert balance == Decimal("300.00")
 
+    async def test_account_balance_from_cached_balances(
+        self,
+        account_repo: AccountRepository,
+        transaction_repo: TransactionRepository,
+        sample_accounts: dict,
+    ):
+        groceries_id = sample_accounts["Groceries"].id
+        for day, amount in ((1, "100.00"), (10, "40.00"), (15, "200.00")):
+            await transaction_repo.create(
+                date=date(2024, 3, day),
+                narration="Groceries",
+                postings=[
+                    {"account_id": groceries_id, "amount": Decimal(amount)},
+                    {"account_id": sample_accounts["Checking"].id, "amount": None},
+                ],
+            )
+
+        # Checkpoint holds postings before March 10th
+        balance_repo = BalanceRepository(account_repo.session)
+        await balance_repo.cache_balances(date(2024, 3, 10))
+        checkpoint = (
+            await account_repo.session.scalars(
+                select(Balance).where(Balance.account_id == groceries_id)
+            )
+        ).one()
+        assert checkpoint.amount == Decimal("100.00")
+        assert checkpoint.is_verified is False
+        # Computed checkpoints are not net worth entries
+        assert await balance_repo.get_latest_balances(as_of_date=date(2024, 3, 10)) == []
+
+        assert await account_repo.get_balance(
+            groceries_id, as_of_date=date(2024, 3, 9)
+        ) == Decimal("100.00")
+        assert await account_repo.get_balance(
+            groceries_id, as_of_date=date(2024, 3, 10)
+        ) == Decimal("140.00")
+        assert await account_repo.get_balance(
+            groceries_id, as_of_date=date(2024, 3, 20)
+        ) == Decimal("340.00")
+
+    async def test_backdated_postings_invalidate_cached_balances(
+        self,
+        account_repo: AccountRepository,
+        transaction_repo: TransactionRepository,
+        sample_accounts: dict,
+    ):
+        groceries_id = sample_accounts["Groceries"].id
+        checking_id = sample_accounts["Checking"].id
+
+        async def purchase(day: int, amount: str) -> Transaction:
+            return await transaction_repo.create(
+                date=date(2024, 3, day),
+                narration="Groceries",
+                postings=[
+                    {"account_id": groceries_id, "amount": Decimal(amount)},
+                    {"account_id": checking_id, "amount": None},
+                ],
+            )
+
+        async def balance(account_id) -> Decimal:
+            return await account_repo.get_balance(account_id, as_of_date=date(2024, 3, 20))
+
+        balance_repo = BalanceRepository(account_repo.session)
+        first = await purchase(1, "100.00")
+        await balance_repo.cache_balances(date(2024, 3, 10))
+
+        # Created before the checkpoint
+        backdated = await purchase(5, "50.00")
+        assert await balance(groceries_id) == Decimal("150.00")
+        assert await balance(checking_id) == Decimal("-150.00")
+
+        # Deleted before the checkpoint
+        await balance_repo.cache_balances(date(2024, 3, 10))
+        await transaction_repo.delete(backdated.id)
+        assert await balance(groceries_id) == Decimal("100.00")
+
+        # Moved to another account before the checkpoint
+        await balance_repo.cache_balances(date(2024, 3, 10))
+        await transaction_repo.update_posting_account(
+            first.id, groceries_id, sample_accounts["Restaurant"].id
+        )
+        assert await balance(groceries_id) == Decimal("0")
+        assert await balance(sample_accounts["Restaurant"].id) == Decimal("100.00")
+
+        # Later postings leave the checkpoint in place
+        await balance_repo.cache_balances(date(2024, 3, 10))
+        await purchase(12, "10.00")
+        assert await account_repo.session.scalar(
+            select(func.count()).select_from(Balance).where(Balance.account_id == checking_id)
+        ) == 1
+        assert await balance(checking_id) == Decimal("-110.00")
+
+
+    async def test_account_balance_ignores_user_assertions(
+        self,
+        account_repo: AccountRepository,
+        transaction_repo: TransactionRepository,
+        sample_accounts: dict,
+    ):
+        checking_id = sample_accounts["Checking"].id
+        await transaction_repo.create(
+            date=date(2024, 3, 1),
+            narration="Paycheck",
+            postings=[
+                {"account_id": checking_id, "amount": Decimal("1000.00")},
+                {"account_id": sample_accounts["Salary"].id, "amount": None},
+            ],
+        )
+        await BalanceRepository(account_repo.session).create_or_update(
+            checking_id, date(2024, 3, 10), Decimal("5000.00"), "USD"
+        )
+        await transaction_repo.create(
+            date=date(2024, 3, 5),
+            narration="Rent",
+            postings=[
+                {"account_id": checking_id, "amount": Decimal("-400.00")},
+                {"account_id": sample_accounts["Transport"].id, "amount": None},
+            ],
+        )
+
+        assert await account_repo.get_balance(
+            checking_id, as_of_date=date(2024, 3, 20)
+        ) == Decimal("600.00")
+        statement = await transaction_repo.get_account_statement(
+            checking_id, date(2024, 3, 1), date(2024, 3, 20)
+        )
+        assert statement[-1]["balance"] == Decimal("600.00")
+
 
 @pytest.mark.asyncio
 class TestAccountStatement:
@@ -469,3 +718,47 @@ class TestAccountStatement:
 
         assert statement[1]["amount"] == Decimal("50.00")
         assert statement[1]["balance"] == Decimal("150.00")
+
+    async def test_get_account_statement_with_opening_balance(
+        self,
+        transaction_repo: TransactionRepository,
+        sample_accounts: dict,
+    ):
+        await transaction_repo.create(
+            date=date(2024, 2, 15),
+            narration="Before statement",
+            postings=[
+                {"account_id": sample_accounts["Groceries"].id, "amount": Decimal("25.00")},
+                {"account_id": sample_accounts["Checking"].id, "amount": Decimal("-25.00")},
+            ],
+        )
+
+        await transaction_repo.create(
+            date=date(2024, 3, 5),
+            narration="In statement",
+            postings=[
+                {"account_id": sample_accounts["Groceries"].id, "amount": Decimal("75.00")},
+                {"account_id": sample_accounts["Checking"].id, "amount": Decimal("-75.00")},
+            ],
+        )
+
+        statement = await transaction_repo.get_account_statement(
+            account_id=sample_accounts["Groceries"].id,
+            start_date=date(2024, 3, 1),
+            end_date=date(2024, 3, 31),
+        )
+
+        streamed = [
+            entry
+            async for entry in transaction_repo.iter_account_statement(
+                account_id=sample_accounts["Groceries"].id,
+                start_date=date(2024, 3, 1),
+                end_date=date(2024, 3, 31),
+            )
+        ]
+        assert streamed == statement
+
+        assert len(statement) == 1
+        assert statement[0]["narration"] == "In statement"
+        assert statement[0]["amount"] == Decimal("75.00")
+        assert statement[0]["balance"] == Decimal("100.00")
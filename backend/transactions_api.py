@@ -1,6 +1,6 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
-from typing import List, Dict
+from typing import BinaryIO, List, Dict
 from accounting.store import load, persist, first_link
 from accounting import store
 from accounting.catagory import CATEGORIES
@@ -8,13 +8,18 @@ from accounting.cc import convert_fidelity_cc_to_beancount
 from accounting.accounts import account_directives
 from accounting.transactions import build_transaction_dicts
 from datetime import datetime
+from functools import lru_cache
+import asyncio
 import pandas as pd
-from fastapi import UploadFile
+from fastapi import Response, UploadFile
+from fastapi.responses import ORJSONResponse
 import os
 import traceback
 
 router = APIRouter()
 
+UPLOAD_DIR = "/tmp"
+
 class Transaction(BaseModel):
     id: str
     date: str
@@ -24,44 +29,55 @@ class Transaction(BaseModel):
     to_account: str  # Debit account
     links: List[str]
 
+@lru_cache(maxsize=8)
+def _load_transaction_dicts(beancount_filepath: str, mtime: float) -> list[dict]:
+    """Load a beancount file as transaction dicts; mtime keys out stale copies."""
+    return build_transaction_dicts(load(beancount_filepath))
+
+def _transaction_dicts(beancount_filepath: str) -> list[dict]:
+    return _load_transaction_dicts(beancount_filepath, os.path.getmtime(beancount_filepath))
+
+def _convert_csv_statement(source: BinaryIO, beancount_filepath: str) -> int:
+    """Parse a CSV statement, persist it as beancount and return the transaction count."""
+    # Arrow's multithreaded reader; keep Date as text, since the
+    # converters parse it themselves
+    sample_txns = pd.read_csv(source, engine="pyarrow", dtype={"Date": str})
+
+    # Convert to beancount format
+    beancount_txns = convert_fidelity_cc_to_beancount(sample_txns)
+    all_entries = account_directives + beancount_txns
+    store.persist(all_entries, beancount_filepath)
+    # Loading here also warms the cache the first page is served from
+    return len(_transaction_dicts(beancount_filepath))
+
 @router.post("/upload")
 async def upload_file(file: UploadFile):
     try:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        os.makedirs("/tmp", exist_ok=True)
+        os.makedirs(UPLOAD_DIR, exist_ok=True)
 
         # Determine file type from extension
         file_extension = os.path.splitext(file.filename)[1].lower()
 
-        # Save the uploaded file
-        if file_extension == '.pdf':
-            filename = f"/tmp/upload_{timestamp}.pdf"
-        else:
-            filename = f"/tmp/upload_{timestamp}.csv"
-
-        content = await file.read()
-        with open(filename, "wb") as f:
-            f.write(content)
-
         # Process based on file type
         currency = "USD"
         if file_extension == '.pdf':
             raise HTTPException(status_code=400, detail="PDF upload not currently supported")
-        else:
-            sample_txns = pd.read_csv(filename)
 
-        # Convert to beancount format
-        beancount_txns = convert_fidelity_cc_to_beancount(sample_txns)
-        all_entries = account_directives + beancount_txns
-        beancount_filepath = f"/tmp/transactions_{timestamp}.beancount"
-        store.persist(all_entries, beancount_filepath)
-        transactions = load(beancount_filepath)
+        # Parsing, conversion and the beancount load are CPU-bound; run them
+        # in a worker thread so other requests keep being served meanwhile.
+        # The CSV is read straight from the upload's spooled file (in memory
+        # when small, already on disk when large), so it is never copied
+        beancount_filepath = os.path.join(UPLOAD_DIR, f"transactions_{timestamp}.beancount")
+        count = await asyncio.to_thread(
+            _convert_csv_statement, file.file, beancount_filepath
+        )
 
+        # The transactions themselves are paged through GET /transactions
         return {
             "beancount_filepath": beancount_filepath,
-            'categories': CATEGORIES,
-            'transactions': build_transaction_dicts(transactions),
-            "message": f"File uploaded successfully as {filename}",
+            "count": count,
+            "message": f"File {file.filename} uploaded successfully",
             "file_type": "PDF" if file_extension == '.pdf' else "CSV",
             "currency": currency
         }
@@ -69,6 +85,36 @@ async def upload_file(file: UploadFile):
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/transactions")
+async def list_transactions(
+    path: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(500, ge=1, le=5000),
+):
+    # Only serve beancount files written by /upload
+    path = os.path.realpath(path)
+    if os.path.dirname(path) != os.path.realpath(UPLOAD_DIR) or not path.endswith(".beancount"):
+        raise HTTPException(status_code=400, detail="Not an uploaded transactions file")
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Transactions file not found")
+
+    transactions = await asyncio.to_thread(_transaction_dicts, path)
+
+    # Transaction dicts hold only str/float/list values, so hand them to
+    # orjson directly rather than through FastAPI's jsonable_encoder walk
+    return ORJSONResponse({
+        "count": len(transactions),
+        "offset": offset,
+        "transactions": transactions[offset:offset + limit],
+    })
+
+@router.get("/categories")
+async def list_categories(response: Response):
+    # Fixed at import time, so clients can cache it instead of receiving it
+    # with every upload
+    response.headers["Cache-Control"] = "public, max-age=3600"
+    return CATEGORIES
+
 @router.get("/health")
 async def healthcheck():
     return {"status": "ok"}
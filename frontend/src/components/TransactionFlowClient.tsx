@@ -16,6 +16,8 @@ import {
 import TransactionsPage from "@/components/TransactionList";
 import { getBaseHttpUrl } from "@/utils/api";
 
+const TRANSACTIONS_PAGE_SIZE = 500;
+
 export function TransactionFlowClient() {
   const [isMounted, setIsMounted] = useState(false);
   const [uploadErrorMessage, setuploadErrorMessage] = useState<string | null>(null);
@@ -54,20 +56,42 @@ export function TransactionFlowClient() {
 
     try {
       const baseUrl = await getBaseHttpUrl();
-      const response = await fetch(`${baseUrl}/api/upload`, {
-        method: "POST",
-        body: formData,
-      });
+      const [response, categoriesResponse] = await Promise.all([
+        fetch(`${baseUrl}/api/upload`, {
+          method: "POST",
+          body: formData,
+        }),
+        // Static list; served with Cache-Control so the browser reuses it
+        fetch(`${baseUrl}/api/categories`),
+      ]);
 
-      if (!response.ok) {
+      if (!response.ok || !categoriesResponse.ok) {
         throw new Error("File upload failed");
       }
 
       const data = await response.json();
       setBeancountFilepath(data.beancount_filepath);
-      setCategories(data.categories);
-      setTransactions(data.transactions);
+      setCategories(await categoriesResponse.json());
       setCurrency(data.currency || "USD");
+
+      // Transactions are fetched page by page so the first rows render
+      // before the whole statement has been transferred
+      const loaded: typeof transactions = [];
+      setTransactions([]);
+      for (let offset = 0; offset < data.count; offset += TRANSACTIONS_PAGE_SIZE) {
+        const params = new URLSearchParams({
+          path: data.beancount_filepath,
+          offset: String(offset),
+          limit: String(TRANSACTIONS_PAGE_SIZE),
+        });
+        const pageResponse = await fetch(`${baseUrl}/api/transactions?${params}`);
+        if (!pageResponse.ok) {
+          throw new Error("Loading transactions failed");
+        }
+        const page = await pageResponse.json();
+        loaded.push(...page.transactions);
+        setTransactions([...loaded]);
+      }
     } catch (error) {
       console.error("Error uploading file:", error);
       setuploadErrorMessage("Error uploading file");
@@ -83,6 +83,14 @@ export function useAgentWorkflow() {
           setCategories(message.data.categories);
           break;
 
+        case "PROGRESS":
+          setState((prev) => ({
+            ...prev!,
+            currentStep: message.data.current_step,
+            progress: message.data.progress,
+          }));
+          break;
+
         case "FEEDBACK_REQUIRED":
           console.log(message.data);
           setCategories(message.data.categories);